@@ -12,6 +12,8 @@ from src.ui_components import (
     render_getting_started, render_system_info, 
     render_processing_spinner
 )
+from src.config import Config
+from src.conversation import ConversationMemory
 from src.rag_pipeline import RAGPipeline
 
 load_dotenv()
@@ -29,6 +31,13 @@ def initialize_session_state():
 
     if 'messages' not in st.session_state:
         st.session_state.messages = []
+
+    if 'conversation' not in st.session_state:
+        conversation_config = Config.get_conversation_config()
+        st.session_state.conversation = ConversationMemory(
+            max_turns=conversation_config['window_turns'],
+            summary_max_chars=conversation_config['summary_max_chars']
+        )
     
     if 'rag_sources' not in st.session_state:
         st.session_state.rag_sources = []
@@ -39,53 +48,57 @@ def initialize_session_state():
     if 'document_stats' not in st.session_state:
         st.session_state.document_stats = None
 
-def process_uploaded_document(uploaded_file):
+def parse_tags(text):
+    return [tag.strip() for tag in (text or "").split(",") if tag.strip()]
+
+def process_uploaded_documents(uploaded_files, tags=None):
+    tmp_file_paths = []
     try:
-        st.info(f"Starting to process: {uploaded_file.name}")
+        st.info(f"Starting to process: {', '.join(f.name for f in uploaded_files)}")
         
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.txt', mode='w', encoding='utf-8') as tmp_file:
-            content = uploaded_file.getvalue().decode('utf-8')
-            tmp_file.write(content)
-            tmp_file_path = tmp_file.name
-
-        st.info(f"File saved temporarily at: {tmp_file_path}")
-        st.info(f"File content length: {len(content)} characters")
+        # Save uploaded files temporarily
+        # Keep the original extension so the matching loader is used
+        for uploaded_file in uploaded_files:
+            suffix = os.path.splitext(uploaded_file.name)[1] or '.txt'
+            with tempfile.NamedTemporaryFile(delete=False, suffix=suffix, mode='wb') as tmp_file:
+                content = uploaded_file.getvalue()
+                tmp_file.write(content)
+                tmp_file_paths.append(tmp_file.name)
+            st.info(f"{uploaded_file.name} saved temporarily ({len(content)} bytes)")
 
         # Initialize RAG pipeline if not already done
         if st.session_state.rag_pipeline is None:
             st.info("Initializing RAG pipeline...")
             st.session_state.rag_pipeline = RAGPipeline()
 
-        # Process document
-        st.info("Processing document through RAG pipeline...")
-        success = st.session_state.rag_pipeline.process_document(tmp_file_path)
+        # Process documents, parsed in parallel and indexed as one batch
+        st.info("Processing documents through RAG pipeline...")
+        success = st.session_state.rag_pipeline.process_documents(tmp_file_paths, filenames=[f.name for f in uploaded_files], tags=tags)
         
         if success:
-            st.info("Document processed successfully, getting statistics...")
-            # Get document statistics
-            chunks = st.session_state.rag_pipeline.document_processor.process_document(tmp_file_path)
-            stats = st.session_state.rag_pipeline.document_processor.get_document_stats(chunks)
+            stats = st.session_state.rag_pipeline.last_ingest_stats
             
             # Update session state
             st.session_state.document_loaded = True
             st.session_state.document_stats = stats
             
-            st.info(f"Document processed successfully: {stats['total_chunks']} chunks")
+            st.info(f"Documents processed successfully: {stats['total_chunks']} chunks")
         else:
-            st.error("Failed to process document")
-        
-        # Clean up temporary file
-        os.unlink(tmp_file_path)
+            st.error("Failed to process documents")
         
         return success
         
     except Exception as e:
-        st.error(f"Error processing uploaded document: {e}")
-        logger.error(f"Error processing uploaded document: {e}")
+        st.error(f"Error processing uploaded documents: {e}")
+        logger.error(f"Error processing uploaded documents: {e}")
         return False
+
+    finally:
+        # Clean up temporary files
+        for tmp_file_path in tmp_file_paths:
+            os.unlink(tmp_file_path)
     
-def handle_user_query(user_question):
+def handle_user_query(user_question, search_filter=None):
     try:
         if not st.session_state.rag_pipeline or not st.session_state.document_loaded:
             return "Please upload a document first before asking questions.", []
@@ -95,14 +108,15 @@ def handle_user_query(user_question):
         
         # Get response from RAG pipeline
         with render_processing_spinner("Thinking..."):
-            answer, source_docs = st.session_state.rag_pipeline.query(user_question)
+            answer, source_docs = st.session_state.rag_pipeline.query(user_question, filter=search_filter, conversation=st.session_state.conversation)
 
          # Add assistant response to messages
         st.session_state.messages.append({
             "role": "assistant", 
             "content": answer, 
-            "sources": source_docs
+            "sources": source_docs[:3]
         })
+        trim_chat_history()
 
         logger.info(f"Query processed: '{user_question[:50]}...'")
         return answer, source_docs
@@ -113,16 +127,24 @@ def handle_user_query(user_question):
         st.session_state.messages.append({"role": "assistant", "content": error_message, "sources": []})
         return error_message, []
     
+def trim_chat_history():
+    # Only a sliding window is kept for display; older turns live on in the conversation summary
+    max_messages = Config.get_conversation_config()['chat_history_max_messages']
+    if len(st.session_state.messages) > max_messages:
+        del st.session_state.messages[:len(st.session_state.messages) - max_messages]
+
 def clear_all_documents():
     st.session_state.rag_sources = []
     st.session_state.document_loaded = False
     st.session_state.document_stats = None
-    st.session_state.rag_pipeline = None
     st.session_state.uploaded_files = []
 
-    # Clear the vector store as well
-    if st.session_state.rag_pipeline and st.session_state.rag_pipeline.vector_store_manager:
-        st.session_state.rag_pipeline.vector_store_manager.clear_vector_store()
+    # Clear the vector store as well, then release the pipeline before dropping it
+    if st.session_state.rag_pipeline:
+        if st.session_state.rag_pipeline.vector_store_manager:
+            st.session_state.rag_pipeline.vector_store_manager.clear_vector_store()
+        st.session_state.rag_pipeline.close()
+    st.session_state.rag_pipeline = None
     
     # Increment uploader key to reset file uploader
     if 'uploader_key' not in st.session_state:
@@ -130,29 +152,33 @@ def clear_all_documents():
     st.session_state.uploader_key += 1
     st.rerun()
 
-def process_uploaded_files():
+def process_uploaded_files(tags=None):
     if 'uploaded_files' in st.session_state and st.session_state.uploaded_files:
+        new_files = []
         for uploaded_file in st.session_state.uploaded_files:
             if uploaded_file.name not in st.session_state.rag_sources:
-                # Simple test - just read the file content first
                 try:
-                    content = uploaded_file.getvalue().decode('utf-8')
-                    st.success(f"✅ {uploaded_file.name} uploaded successfully! Content length: {len(content)} characters")
-                    st.session_state.rag_sources.append(uploaded_file.name)
-                    
-                    # Set document_loaded to True when we have files
-                    st.session_state.document_loaded = True
-                    
-                    # Now try to process with RAG pipeline
-                    with st.spinner(f"Processing {uploaded_file.name} with RAG..."):
-                        success = process_uploaded_document(uploaded_file)
-                        if success:
-                            st.success(f"✅ {uploaded_file.name} RAG processing completed!")
-                        else:
-                            st.error(f"❌ RAG processing failed for {uploaded_file.name}")
+                    content = uploaded_file.getvalue()
+                    st.success(f"✅ {uploaded_file.name} uploaded successfully! File size: {len(content)} bytes")
+                    new_files.append(uploaded_file)
                             
                 except Exception as e:
                     st.error(f"❌ Error reading {uploaded_file.name}: {e}")
+
+        if new_files:
+            names = ", ".join(f.name for f in new_files)
+            st.session_state.rag_sources.extend(f.name for f in new_files)
+
+            # Set document_loaded to True when we have files
+            st.session_state.document_loaded = True
+
+            # All new uploads go through the RAG pipeline together
+            with st.spinner(f"Processing {names} with RAG..."):
+                success = process_uploaded_documents(new_files, tags=tags)
+                if success:
+                    st.success(f"✅ {names} RAG processing completed!")
+                else:
+                    st.error(f"❌ RAG processing failed for {names}")
         
         # Clear the uploaded files from session state to prevent reprocessing
         st.session_state.uploaded_files = []
@@ -177,6 +203,7 @@ def main():
     with col1:
         if st.button("Clear Chat", type="primary"):
             st.session_state.messages.clear()
+            st.session_state.conversation.clear()
             st.rerun()
     with col2:
         if st.button("Clear All Documents", type="secondary"):
@@ -186,10 +213,13 @@ def main():
     if 'uploader_key' not in st.session_state:
         st.session_state.uploader_key = 0
     
+    # Tags are stored on every chunk of the next upload and can be used to filter searches
+    upload_tags = st.text_input("🏷️ Tags for uploaded documents (comma separated)", key="upload_tags", placeholder="e.g. finance, 2024")
+
     # File upload input 
     uploaded_files = st.file_uploader(
-        "📄 Upload a text document (.txt only, max 200MB)", 
-        type=["txt"],
+        "📄 Upload a document (.txt, .md, .html, .csv or .pdf, max 200MB)", 
+        type=Config.SUPPORTED_FILE_TYPES,
         accept_multiple_files=True,
        key=f"rag_docs_{st.session_state.uploader_key}"
     )
@@ -198,7 +228,7 @@ def main():
     if uploaded_files:
         st.session_state.uploaded_files = uploaded_files
         st.info(f"Files uploaded: {[f.name for f in uploaded_files]}")
-        process_uploaded_files()
+        process_uploaded_files(tags=parse_tags(upload_tags))
     
     # Show documents in DB with individual remove buttons
     with st.expander(f"📚 Documents in DB ({len(st.session_state.rag_sources)})"):
@@ -215,21 +245,28 @@ def main():
                         if len(st.session_state.rag_sources) == 0:
                             st.session_state.document_loaded = False
                             st.session_state.document_stats = None
+                            if st.session_state.rag_pipeline:
+                                st.session_state.rag_pipeline.close()
                             st.session_state.rag_pipeline = None
                         st.rerun()
         else:
             st.write("No documents in database")
+
+    # Optionally restrict answers to selected documents
+    selected_sources = st.multiselect("🔎 Search only in", st.session_state.rag_sources) if st.session_state.rag_sources else []
+    search_filter = st.session_state.rag_pipeline.vector_store_manager.build_filter(filenames=selected_sources) if st.session_state.rag_pipeline else None
     
 
     
     # Display chat history
+    if st.session_state.conversation.summary:
+        st.caption(f"Earlier in this chat: {st.session_state.conversation.summary}")
     for message in st.session_state.messages:
         with st.chat_message(message["role"]):
             st.markdown(message["content"])
     
     # Chat input
     if prompt := st.chat_input("Your message"):
-        st.session_state.messages.append({"role": "user", "content": prompt})
         with st.chat_message("user"):
             st.markdown(prompt)
         
@@ -238,7 +275,7 @@ def main():
             full_response = ""
             
             # RAG response
-            answer, source_docs = handle_user_query(prompt)
+            answer, source_docs = handle_user_query(prompt, search_filter)
             st.write(answer)
             
             # Show source documents if available
@@ -0,0 +1,108 @@
+import argparse
+import csv
+import logging
+import os
+import random
+import tempfile
+import time
+
+from src.document_processor import DocumentProcessor
+
+WORDS = ("retrieval augmented generation document chunk embedding vector index query answer "
+         "section page table report policy audit revenue contract clause summary detail").split()
+
+def sentence(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 18))).capitalize() + "."
+
+def paragraph(rng: random.Random) -> str:
+    return " ".join(sentence(rng) for _ in range(rng.randint(3, 8)))
+
+def write_txt(path: str, sections: int, rng: random.Random):
+    with open(path, 'w', encoding='utf-8') as f:
+        for _ in range(sections):
+            f.write(paragraph(rng) + "\n\n")
+
+def write_markdown(path: str, sections: int, rng: random.Random):
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(sections):
+            f.write(f"## Section {i}\n\n{paragraph(rng)}\n\n- {sentence(rng)}\n- {sentence(rng)}\n\n")
+
+def write_html(path: str, sections: int, rng: random.Random):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("<html><head><title>Benchmark</title><style>p { margin: 0 }</style></head><body>\n")
+        for i in range(sections):
+            f.write(f"<h2>Section {i}</h2>\n<p>{paragraph(rng)}</p>\n<ul><li>{sentence(rng)}</li></ul>\n")
+        f.write("</body></html>\n")
+
+def write_csv(path: str, sections: int, rng: random.Random):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['id', 'title', 'body'])
+        for i in range(sections * 4):
+            writer.writerow([i, sentence(rng), paragraph(rng)])
+
+def write_pdf(path: str, sections: int, rng: random.Random):
+    # Minimal uncompressed PDF: one Helvetica page per section, one line of text per Tj
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for _ in range(sections):
+        lines = [sentence(rng) for _ in range(rng.randint(20, 40))]
+        text = " ".join(f"({line}) Tj T*" for line in lines)
+        stream = f"BT /F1 10 Tf 12 TL 50 780 Td {text} ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        page_ids.append(len(objects))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(page_ids)} >>"
+
+    with open(path, 'wb') as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(f.tell())
+            f.write(f"{number} 0 obj\n{body}\nendobj\n".encode('latin-1'))
+        xref = f.tell()
+        f.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode('latin-1'))
+        for offset in offsets:
+            f.write(f"{offset:010d} 00000 n \n".encode('latin-1'))
+        f.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode('latin-1'))
+
+WRITERS = {'txt': write_txt, 'md': write_markdown, 'html': write_html, 'csv': write_csv, 'pdf': write_pdf}
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure parse throughput per document format")
+    parser.add_argument('--formats', default=','.join(WRITERS))
+    parser.add_argument('--sections', type=int, default=2000, help="Sections (pages for PDF) per generated file")
+    parser.add_argument('--files', type=int, default=8, help="Files per format for the parallel run")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    processor = DocumentProcessor()
+    rng = random.Random(0)
+
+    print(f"{'format':>6} {'MB':>7} {'records':>8} {'parse MB/s':>11} {'serial MB/s':>12} {'parallel MB/s':>14} {'chunks':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for file_type in args.formats.split(','):
+            paths = [os.path.join(directory, f"sample_{i}.{file_type}") for i in range(args.files)]
+            for path in paths:
+                WRITERS[file_type](path, args.sections, rng)
+            megabytes = sum(os.path.getsize(path) for path in paths) / 1e6
+
+            # Parse only, then parse and chunk serially and across the process pool
+            start = time.perf_counter()
+            records = sum(1 for path in paths for _ in processor.iter_document(path))
+            parse_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            processor.process_documents(paths, max_workers=1)
+            serial_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            results = processor.process_documents(paths, max_workers=args.workers)
+            parallel_seconds = time.perf_counter() - start
+            chunks = sum(len(result) for result in results)
+
+            print(f"{file_type:>6} {megabytes:>7.1f} {records:>8} {megabytes / parse_seconds:>11.2f} {megabytes / serial_seconds:>12.2f} {megabytes / parallel_seconds:>14.2f} {chunks:>8}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import argparse
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.config import Config
+from src.embedding_manager import EmbeddingManager
+from src.embedding_batcher import MicroBatchEmbedder
+
+def run_load(embed_fn, queries, concurrency: int) -> float:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(embed_fn, queries))
+    return len(queries) / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare query embedding throughput with and without micro-batching")
+    parser.add_argument('--queries', type=int, default=512)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--max-wait-ms', type=float, default=Config.DEFAULT_QUERY_BATCH_MAX_WAIT_MS)
+    parser.add_argument('--max-batch-size', type=int, default=Config.DEFAULT_QUERY_BATCH_MAX_SIZE)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    manager = EmbeddingManager(model_name=Config.get_embedding_config()['model_name'])
+    embeddings = manager.get_embeddings()
+    queries = [f"what does section {i} say about topic {i % 17}?" for i in range(args.queries)]
+    embeddings.embed_query("warmup")
+
+    direct_qps = run_load(embeddings.embed_query, queries, args.concurrency)
+
+    batcher = MicroBatchEmbedder(embeddings, max_wait_ms=args.max_wait_ms, max_batch_size=args.max_batch_size)
+    try:
+        batched_qps = run_load(batcher.embed_query, queries, args.concurrency)
+        stats = batcher.get_stats()
+    finally:
+        batcher.close()
+
+    print(f"direct:  {direct_qps:8.1f} queries/s")
+    print(f"batched: {batched_qps:8.1f} queries/s ({batched_qps / direct_qps:.2f}x)")
+    print(f"batches: {stats['total_batches']}, avg size {stats['avg_batch_size']:.1f}, max size {stats['max_batch_size_observed']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import argparse
+import csv
+import itertools
+import logging
+import time
+import uuid
+import chromadb
+import numpy as np
+
+from src.config import Config
+from src.embedding_manager import EmbeddingManager
+from src.vector_store import VectorStoreManager, exact_distances
+
+BATCH_SIZE = 5000
+
+def load_collection(persist_directory: str, collection_name: str):
+    client = chromadb.PersistentClient(path=persist_directory)
+    collection = client.get_collection(collection_name)
+    ids, embeddings = [], []
+    offset = 0
+    while True:
+        batch = collection.get(include=['embeddings'], limit=BATCH_SIZE, offset=offset)
+        if not batch['ids']:
+            break
+        ids.extend(batch['ids'])
+        embeddings.extend(batch['embeddings'])
+        offset += len(batch['ids'])
+    return ids, np.asarray(embeddings, dtype=np.float32), VectorStoreManager.read_index_params(collection)
+
+def exact_top_k(corpus: np.ndarray, queries: np.ndarray, k: int, metric: str) -> np.ndarray:
+    distances = exact_distances(corpus, queries, metric)
+    top = np.argpartition(distances, k - 1, axis=1)[:, :k]
+    order = np.take_along_axis(distances, top, axis=1).argsort(axis=1)
+    return np.take_along_axis(top, order, axis=1)
+
+def evaluate(ids, corpus, queries, truth, k: int, params: dict) -> dict:
+    client = chromadb.EphemeralClient()
+    collection = client.create_collection(
+        name=f"sweep_{uuid.uuid4().hex[:8]}",
+        metadata=VectorStoreManager.build_collection_metadata(params)
+    )
+
+    build_start = time.perf_counter()
+    for start in range(0, len(ids), BATCH_SIZE):
+        collection.add(ids=ids[start:start + BATCH_SIZE], embeddings=corpus[start:start + BATCH_SIZE])
+    build_seconds = time.perf_counter() - build_start
+
+    position = {doc_id: i for i, doc_id in enumerate(ids)}
+    latencies, hits = [], 0
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        result = collection.query(query_embeddings=[query], n_results=k, include=[])
+        latencies.append(time.perf_counter() - start)
+        found = {position[doc_id] for doc_id in result['ids'][0]}
+        hits += len(found.intersection(expected.tolist()))
+
+    client.delete_collection(collection.name)
+    latencies_ms = np.asarray(latencies) * 1000
+    return {
+        **params,
+        'recall_at_k': hits / (len(queries) * k),
+        'mean_latency_ms': float(latencies_ms.mean()),
+        'p95_latency_ms': float(np.percentile(latencies_ms, 95)),
+        'build_seconds': build_seconds
+    }
+
+def parse_ints(value: str):
+    return [int(item) for item in value.split(',')]
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep HNSW parameters and report recall vs latency for a collection")
+    vector_config = Config.get_vector_store_config()
+    parser.add_argument('--queries', required=True, help="Held-out query set, one query per line")
+    parser.add_argument('--persist-directory', default=vector_config['persist_directory'])
+    parser.add_argument('--collection', default=vector_config['collection_name'])
+    parser.add_argument('--k', type=int, default=vector_config['retrieval_k'])
+    parser.add_argument('--metric', choices=Config.SUPPORTED_DISTANCE_METRICS, default=None, help="Defaults to the collection's metric")
+    parser.add_argument('--m', type=parse_ints, default=[8, 16, 32])
+    parser.add_argument('--ef-construction', type=parse_ints, default=[100, 200])
+    parser.add_argument('--ef-search', type=parse_ints, default=[10, 50, 100])
+    parser.add_argument('--output', help="Optional CSV file for the results")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    with open(args.queries, encoding='utf-8') as f:
+        questions = [line.strip() for line in f if line.strip()]
+
+    ids, corpus, index_params = load_collection(args.persist_directory, args.collection)
+    metric = args.metric or index_params['distance_metric']
+    k = min(args.k, len(ids))
+    manager = EmbeddingManager(model_name=Config.get_embedding_config()['model_name'])
+    queries = np.asarray(manager.generate_embeddings(questions), dtype=np.float32)
+    truth = exact_top_k(corpus, queries, k, metric)
+    print(f"{len(ids)} vectors, {len(queries)} queries, k={k}, metric={metric}")
+
+    results = []
+    print(f"{'M':>4} {'ef_c':>6} {'ef_s':>6} {'recall':>8} {'mean ms':>9} {'p95 ms':>9} {'build s':>9}")
+    for m, ef_construction, ef_search in itertools.product(args.m, args.ef_construction, args.ef_search):
+        params = {'distance_metric': metric, 'm': m, 'ef_construction': ef_construction, 'ef_search': ef_search}
+        row = evaluate(ids, corpus, queries, truth, k, params)
+        results.append(row)
+        print(f"{m:>4} {ef_construction:>6} {ef_search:>6} {row['recall_at_k']:>8.4f} {row['mean_latency_ms']:>9.3f} {row['p95_latency_ms']:>9.3f} {row['build_seconds']:>9.2f}")
+
+    if args.output:
+        with open(args.output, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=list(results[0].keys()))
+            writer.writeheader()
+            writer.writerows(results)
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
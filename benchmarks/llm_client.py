@@ -0,0 +1,78 @@
+import argparse
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+import numpy as np
+from langchain_core.messages import HumanMessage
+
+from src.llm_client import LLMClient
+from tests.stub_llm_server import StubChatModel, StubServer
+
+def run(call, prompts: List[str], concurrency: int) -> dict:
+    latencies, failures = [], 0
+    lock = threading.Lock()
+
+    def one(prompt: str):
+        nonlocal failures
+        start = time.perf_counter()
+        try:
+            call([HumanMessage(content=prompt)])
+            with lock:
+                latencies.append(time.perf_counter() - start)
+        except Exception:
+            with lock:
+                failures += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(one, prompts))
+    latencies_ms = np.asarray(latencies or [0.0]) * 1000
+    return {
+        'ok': len(latencies),
+        'failed': failures,
+        'wall_seconds': time.perf_counter() - start,
+        'p50_ms': float(np.percentile(latencies_ms, 50)),
+        'p95_ms': float(np.percentile(latencies_ms, 95))
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Exercise the LLM client layer against a local stub server")
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--unique-prompts', type=int, default=60, help="Prompts are drawn from this many distinct questions")
+    parser.add_argument('--concurrency', type=int, default=32, help="Caller threads")
+    parser.add_argument('--server-rate', type=float, default=40.0, help="Requests per second the stub accepts before returning 429")
+    parser.add_argument('--server-latency', type=float, default=0.1)
+    parser.add_argument('--error-rate', type=float, default=0.05, help="Fraction of accepted requests failing with 503")
+    parser.add_argument('--client-rate', type=float, default=35.0)
+    parser.add_argument('--max-concurrency', type=int, default=8)
+    parser.add_argument('--timeout', type=float, default=30.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    rng = random.Random(0)
+    prompts = [f"Question {rng.randrange(args.unique_prompts)} about the corpus" for _ in range(args.requests)]
+
+    print(f"{'mode':>8} {'ok':>5} {'failed':>7} {'server reqs':>12} {'429s':>6} {'503s':>6} {'peak':>5} {'wall s':>7} {'p50 ms':>8} {'p95 ms':>8}")
+    for mode in ('direct', 'client'):
+        server = StubServer(args.server_latency, args.server_rate, max(1, int(args.server_rate)), args.error_rate)
+        model = StubChatModel(url=server.start())
+
+        if mode == 'direct':
+            result = run(model.invoke, prompts, args.concurrency)
+        else:
+            client = LLMClient(model, requests_per_second=args.client_rate, burst=max(1, int(args.client_rate)), max_concurrency=args.max_concurrency, timeout_seconds=args.timeout)
+            result = run(client.invoke, prompts, args.concurrency)
+            stats = client.get_stats()
+            client.close()
+
+        server.stop()
+        counts = server.counts
+        print(f"{mode:>8} {result['ok']:>5} {result['failed']:>7} {counts['requests']:>12} {counts['throttled']:>6} {counts['errors']:>6} {server.peak_in_flight:>5} {result['wall_seconds']:>7.2f} {result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f}")
+
+    print(f"client: {stats['coalesced']} coalesced, {stats['retries']} retries, {stats['timeouts']} timeouts")
+
+if __name__ == "__main__":
+    main()
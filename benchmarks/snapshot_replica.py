@@ -0,0 +1,130 @@
+import argparse
+import logging
+import multiprocessing
+import os
+import tempfile
+import time
+from typing import List
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from src.snapshot import SnapshotReplica, export_snapshot
+from src.vector_store import VectorStoreManager
+
+BATCH_SIZE = 5000
+CLUSTERS = 256
+
+def cluster_centers(dimension: int) -> np.ndarray:
+    return np.random.default_rng(42).standard_normal((CLUSTERS, dimension), dtype=np.float32)
+
+def sample_clustered(rng: np.random.Generator, centers: np.ndarray, count: int) -> np.ndarray:
+    # Gaussian mixture, so nearest neighbours have the structure real embeddings have
+    return centers[rng.integers(len(centers), size=count)] + 0.5 * rng.standard_normal((count, centers.shape[1]), dtype=np.float32)
+
+class RandomEmbeddings(Embeddings):
+    # Stands in for the model so the benchmark measures only storage and search
+    def __init__(self, dimension: int):
+        self.dimension = dimension
+        self.centers = cluster_centers(dimension)
+        self.rng = np.random.default_rng(1)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return sample_clustered(self.rng, self.centers, len(texts)).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+def build_collection(persist_directory: str, chunks: int, dimension: int, documents: int) -> VectorStoreManager:
+    manager = VectorStoreManager(persist_directory=persist_directory, embedding_function=RandomEmbeddings(dimension))
+    manager.initialize_vector_store()
+    collection = manager.vector_store._collection
+    rng = np.random.default_rng(0)
+    centers = cluster_centers(dimension)
+    for start in range(0, chunks, BATCH_SIZE):
+        end = min(start + BATCH_SIZE, chunks)
+        collection.add(
+            ids=[f"chunk-{i}" for i in range(start, end)],
+            embeddings=sample_clustered(rng, centers, end - start),
+            documents=[f"Synthetic chunk {i}" for i in range(start, end)],
+            metadatas=[{'doc_id': f"doc-{i % documents}", 'filename': f"doc-{i % documents}.txt", 'chunk_index': i // documents, 'ingested_at': 1700000000 + i // documents, 'tag_finance': i % 3 == 0} for i in range(start, end)]
+        )
+    return manager
+
+def time_queries(store, queries: int, k: int, filter=None) -> float:
+    start = time.perf_counter()
+    for i in range(queries):
+        store.similarity_search_with_score(f"query {i}", k=k, filter=filter)
+    return (time.perf_counter() - start) / queries * 1000
+
+def recall(replica: SnapshotReplica, queries: int, k: int, filter=None) -> float:
+    # Fraction of the exact top-k that the replica's IVF search returns
+    embeddings = np.asarray(RandomEmbeddings(replica.header['dimension']).embed_documents([""] * queries), dtype=np.float32)
+    approximate = replica._top_k(embeddings, k, filter)
+    mask = replica._where_mask(filter) if filter else None
+    exact = replica._scan(embeddings, k, mask)
+    found = sum(len({row for row, _ in a} & {row for row, _ in e}) for a, e in zip(approximate, exact))
+    return found / max(1, sum(len(e) for e in exact))
+
+def open_replica(args):
+    path, dimension, k = args
+    start = time.perf_counter()
+    replica = SnapshotReplica(path, embedding_function=RandomEmbeddings(dimension))
+    open_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    replica.similarity_search_with_score("first query", k=k)
+    first_query_ms = (time.perf_counter() - start) * 1000
+    replica.close()
+    return open_ms, first_query_ms
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare snapshot replica open time and query latency with Chroma")
+    parser.add_argument('--chunks', type=int, default=50000)
+    parser.add_argument('--dimension', type=int, default=384)
+    parser.add_argument('--documents', type=int, default=500)
+    parser.add_argument('--queries', type=int, default=100)
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--processes', type=int, default=4, help="Replica processes opening the same file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    with tempfile.TemporaryDirectory() as directory:
+        persist_directory = os.path.join(directory, "chroma")
+        path = os.path.join(directory, "kb.ragsnap")
+        manager = build_collection(persist_directory, args.chunks, args.dimension, args.documents)
+
+        start = time.perf_counter()
+        export_snapshot(manager, path)
+        print(f"export: {time.perf_counter() - start:.2f}s, {os.path.getsize(path) / 1e6:.1f} MB")
+        del manager
+
+        start = time.perf_counter()
+        chroma = VectorStoreManager(persist_directory=persist_directory, embedding_function=RandomEmbeddings(args.dimension))
+        chroma.initialize_vector_store()
+        chroma.similarity_search_with_score("first query", k=args.k)
+        print(f"chroma open + first query: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        start = time.perf_counter()
+        replica = SnapshotReplica(path, embedding_function=RandomEmbeddings(args.dimension))
+        open_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        replica.similarity_search_with_score("first query", k=args.k)
+        print(f"replica open: {open_ms:.1f} ms, first query: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        doc_filter = VectorStoreManager.build_filter(doc_ids=["doc-1", "doc-2"])
+        broad_filter = VectorStoreManager.build_filter(tags=["finance"], ingested_after=1700000000 + args.chunks // args.documents // 2)
+        print(f"{'store':>8} {'ms/query':>9} {'doc filter ms/query':>20} {'tag + date ms/query':>20}")
+        for name, store in (('chroma', chroma), ('replica', replica)):
+            print(f"{name:>8} {time_queries(store, args.queries, args.k):>9.2f} {time_queries(store, args.queries, args.k, doc_filter):>20.2f} {time_queries(store, args.queries, args.k, broad_filter):>20.2f}")
+        print(f"replica recall@{args.k}: {recall(replica, args.queries, args.k):.3f} unfiltered, {recall(replica, args.queries, args.k, broad_filter):.3f} tag + date "
+              f"({replica.header['ivf_lists']} lists, nprobe {replica.nprobe})")
+        replica.close()
+
+        # Every process maps the same file, so only the first one pays for reading it from disk
+        context = multiprocessing.get_context('spawn')
+        with context.Pool(args.processes) as pool:
+            results = pool.map(open_replica, [(path, args.dimension, args.k)] * args.processes)
+        for i, (open_ms, first_query_ms) in enumerate(results):
+            print(f"process {i}: open {open_ms:.1f} ms, first query {first_query_ms:.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import argparse
+import json
+import logging
+import sys
+from typing import List
+
+from .config import Config
+from .rag_pipeline import RAGPipeline
+from .vector_store import VectorStoreManager
+
+logger = logging.getLogger(__name__)
+
+def load_questions(path: str) -> List[str]:
+    # Plain text with one question per line, or JSONL records with a "question" field
+    questions = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            questions.append(json.loads(line)['question'] if path.endswith('.jsonl') else line)
+    return questions
+
+def main():
+    parser = argparse.ArgumentParser(description="Answer a file of questions against the knowledge base and stream JSONL results")
+    vector_config = Config.get_vector_store_config()
+    parser.add_argument('questions', help="Questions file (.txt, one per line, or .jsonl with a 'question' field)")
+    parser.add_argument('--output', default='-', help="JSONL output path, '-' for stdout")
+    parser.add_argument('--persist-directory', default=vector_config['persist_directory'])
+    parser.add_argument('--concurrency', type=int, default=None, help="Concurrent LLM calls (default: LLM_MAX_CONCURRENCY)")
+    parser.add_argument('--doc-ids', nargs='*', help="Only search these documents")
+    parser.add_argument('--filenames', nargs='*', help="Only search these filenames")
+    parser.add_argument('--tags', nargs='*', help="Only search chunks with all of these tags")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    questions = load_questions(args.questions)
+    pipeline = RAGPipeline(persist_directory=args.persist_directory)
+    search_filter = VectorStoreManager.build_filter(doc_ids=args.doc_ids, filenames=args.filenames, tags=args.tags)
+
+    output = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    failed = 0
+    try:
+        for result in pipeline.query_batch(questions, filter=search_filter, max_concurrency=args.concurrency):
+            failed += result['error'] is not None
+            output.write(json.dumps(result, ensure_ascii=False) + "\n")
+            output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    logger.info(f"Answered {len(questions) - failed} of {len(questions)} question(s)")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -8,20 +8,53 @@ class Config:
     DEFAULT_CHUNK_SIZE = 1000
     DEFAULT_CHUNK_OVERLAP = 200
     DEFAULT_ENCODING = 'utf-8'
+    DEFAULT_PARSE_WORKERS = 4
 
     # Embedding Model
     DEFAULT_EMBEDDING_MODEL = 'sentence-transformers/all-MiniLM-L6-v2' 
+    DEFAULT_QUERY_MICRO_BATCHING = False
+    DEFAULT_QUERY_BATCH_MAX_WAIT_MS = 5.0
+    DEFAULT_QUERY_BATCH_MAX_SIZE = 32
+    DEFAULT_EMBEDDING_WORKERS = 0
+    DEFAULT_EMBEDDING_WORKER_BATCH_SIZE = 256
+    DEFAULT_EMBEDDING_POOL_MIN_TEXTS = 512
 
     # Vector Store
     DEFAULT_PERSIST_DIRECTORY = "./chroma_db"
     DEFAULT_RETRIEVAL_K = 5 
+    DEFAULT_COLLECTION_NAME = "langchain"
+    DEFAULT_FILTER_EXACT_SEARCH_MAX_CANDIDATES = 2000
+    DEFAULT_SNAPSHOT_PATH = ""
+    DEFAULT_SNAPSHOT_WARM = True
+    DEFAULT_SNAPSHOT_NPROBE = 16
+
+    # Vector Index (HNSW)
+    DEFAULT_DISTANCE_METRIC = "l2"
+    # None leaves the parameter to Chroma's own default
+    DEFAULT_HNSW_M = None
+    DEFAULT_HNSW_EF_CONSTRUCTION = None
+    DEFAULT_HNSW_EF_SEARCH = None
+    SUPPORTED_DISTANCE_METRICS = ["l2", "cosine", "ip"]
 
     # LLM Settings
     DEFAULT_TEMPERATURE = 0.3 
     DEFAULT_CHAIN_TYPE = "stuff" 
+    DEFAULT_LLM_MODEL = "gemini-1.5-flash"
+    DEFAULT_LLM_REQUESTS_PER_SECOND = 5.0
+    DEFAULT_LLM_BURST = 10
+    DEFAULT_LLM_MAX_CONCURRENCY = 8
+    DEFAULT_LLM_MAX_RETRIES = 4
+    DEFAULT_LLM_BACKOFF_BASE_SECONDS = 0.5
+    DEFAULT_LLM_BACKOFF_MAX_SECONDS = 8.0
+    DEFAULT_LLM_TIMEOUT_SECONDS = 60.0
+
+    # Conversation
+    DEFAULT_CONVERSATION_WINDOW_TURNS = 4
+    DEFAULT_CONVERSATION_SUMMARY_MAX_CHARS = 2000
+    DEFAULT_CHAT_HISTORY_MAX_MESSAGES = 20
 
     #File Settings
-    SUPPORTED_FILE_TYPES = ["txt"]
+    SUPPORTED_FILE_TYPES = ["txt", "md", "markdown", "html", "htm", "csv", "pdf"]
     MAX_FILE_SIZE_MB = 100
 
     @classmethod 
@@ -29,30 +62,73 @@ class Config:
         return {
             'chunk_size': int(os.getenv('CHUNK_SIZE', cls.DEFAULT_CHUNK_SIZE)),
             'chunk_overlap': int(os.getenv('CHUNK_OVERLAP', cls.DEFAULT_CHUNK_OVERLAP)),
-            'encoding': os.getenv('ENCODING', cls.DEFAULT_ENCODING)
+            'encoding': os.getenv('ENCODING', cls.DEFAULT_ENCODING),
+            'parse_workers': int(os.getenv('PARSE_WORKERS', cls.DEFAULT_PARSE_WORKERS))
         }
     
     @classmethod
     def get_embedding_config(cls) -> Dict[str, Any]:
         return {
             'model_name': os.getenv('EMBEDDING_MODEL', cls.DEFAULT_EMBEDDING_MODEL),
+            'query_micro_batching': os.getenv('QUERY_MICRO_BATCHING', str(cls.DEFAULT_QUERY_MICRO_BATCHING)).lower() in ('1', 'true', 'yes'),
+            'query_batch_max_wait_ms': float(os.getenv('QUERY_BATCH_MAX_WAIT_MS', cls.DEFAULT_QUERY_BATCH_MAX_WAIT_MS)),
+            'query_batch_max_size': int(os.getenv('QUERY_BATCH_MAX_SIZE', cls.DEFAULT_QUERY_BATCH_MAX_SIZE)),
+            'workers': int(os.getenv('EMBEDDING_WORKERS', cls.DEFAULT_EMBEDDING_WORKERS)),
+            'worker_batch_size': int(os.getenv('EMBEDDING_WORKER_BATCH_SIZE', cls.DEFAULT_EMBEDDING_WORKER_BATCH_SIZE)),
+            'pool_min_texts': int(os.getenv('EMBEDDING_POOL_MIN_TEXTS', cls.DEFAULT_EMBEDDING_POOL_MIN_TEXTS))
         }
     
     @classmethod
     def get_vector_store_config(cls) -> Dict[str, Any]:
         return {
             'persist_directory': os.getenv('PERSIST_DIRECTORY', cls.DEFAULT_PERSIST_DIRECTORY),
-            'retrieval_k': int(os.getenv('RETRIEVAL_K', cls.DEFAULT_RETRIEVAL_K))
+            'retrieval_k': int(os.getenv('RETRIEVAL_K', cls.DEFAULT_RETRIEVAL_K)),
+            'collection_name': os.getenv('COLLECTION_NAME', cls.DEFAULT_COLLECTION_NAME),
+            'filter_exact_search_max_candidates': int(os.getenv('FILTER_EXACT_SEARCH_MAX_CANDIDATES', cls.DEFAULT_FILTER_EXACT_SEARCH_MAX_CANDIDATES)),
+            'index_params': cls.get_index_config(),
+            'snapshot_path': os.getenv('SNAPSHOT_PATH', cls.DEFAULT_SNAPSHOT_PATH),
+            'snapshot_warm': os.getenv('SNAPSHOT_WARM', str(cls.DEFAULT_SNAPSHOT_WARM)).lower() in ('1', 'true', 'yes'),
+            'snapshot_nprobe': int(os.getenv('SNAPSHOT_NPROBE', cls.DEFAULT_SNAPSHOT_NPROBE))
         }
+
+    @classmethod
+    def get_index_config(cls) -> Dict[str, Any]:
+        return {
+            'distance_metric': os.getenv('DISTANCE_METRIC', cls.DEFAULT_DISTANCE_METRIC),
+            'm': cls._optional_int('HNSW_M', cls.DEFAULT_HNSW_M),
+            'ef_construction': cls._optional_int('HNSW_EF_CONSTRUCTION', cls.DEFAULT_HNSW_EF_CONSTRUCTION),
+            'ef_search': cls._optional_int('HNSW_EF_SEARCH', cls.DEFAULT_HNSW_EF_SEARCH)
+        }
+
+    @staticmethod
+    def _optional_int(name: str, default=None):
+        value = os.getenv(name)
+        return int(value) if value else default
     
     @classmethod
     def get_llm_config(cls) -> Dict[str, Any]:
         return {
             'temperature': float(os.getenv('LLM_TEMPERATURE', cls.DEFAULT_TEMPERATURE)),
             'chain_type': os.getenv('LLM_CHAIN_TYPE', cls.DEFAULT_CHAIN_TYPE),
-            'api_key': os.getenv('GOOGLE_API_KEY')
+            'api_key': os.getenv('GOOGLE_API_KEY'),
+            'model': os.getenv('LLM_MODEL', cls.DEFAULT_LLM_MODEL),
+            'requests_per_second': float(os.getenv('LLM_REQUESTS_PER_SECOND', cls.DEFAULT_LLM_REQUESTS_PER_SECOND)),
+            'burst': int(os.getenv('LLM_BURST', cls.DEFAULT_LLM_BURST)),
+            'max_concurrency': int(os.getenv('LLM_MAX_CONCURRENCY', cls.DEFAULT_LLM_MAX_CONCURRENCY)),
+            'max_retries': int(os.getenv('LLM_MAX_RETRIES', cls.DEFAULT_LLM_MAX_RETRIES)),
+            'backoff_base_seconds': float(os.getenv('LLM_BACKOFF_BASE_SECONDS', cls.DEFAULT_LLM_BACKOFF_BASE_SECONDS)),
+            'backoff_max_seconds': float(os.getenv('LLM_BACKOFF_MAX_SECONDS', cls.DEFAULT_LLM_BACKOFF_MAX_SECONDS)),
+            'timeout_seconds': float(os.getenv('LLM_TIMEOUT_SECONDS', cls.DEFAULT_LLM_TIMEOUT_SECONDS))
         }
     
+    @classmethod
+    def get_conversation_config(cls) -> Dict[str, Any]:
+        return {
+            'window_turns': int(os.getenv('CONVERSATION_WINDOW_TURNS', cls.DEFAULT_CONVERSATION_WINDOW_TURNS)),
+            'summary_max_chars': int(os.getenv('CONVERSATION_SUMMARY_MAX_CHARS', cls.DEFAULT_CONVERSATION_SUMMARY_MAX_CHARS)),
+            'chat_history_max_messages': int(os.getenv('CHAT_HISTORY_MAX_MESSAGES', cls.DEFAULT_CHAT_HISTORY_MAX_MESSAGES))
+        }
+
     @classmethod
     def get_file_settings(cls) -> Dict[str, Any]:
         return {
@@ -67,6 +143,7 @@ class Config:
             'embedding': cls.get_embedding_config(),
             'vector_store': cls.get_vector_store_config(),
             'llm': cls.get_llm_config(),
+            'conversation': cls.get_conversation_config(),
             'file_settings': cls.get_file_settings()
         }
     
@@ -76,6 +153,9 @@ class Config:
 
         if not llm_config['api_key']:
             return False
+
+        if cls.get_index_config()['distance_metric'] not in cls.SUPPORTED_DISTANCE_METRICS:
+            return False
         
         return True
     
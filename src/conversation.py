@@ -0,0 +1,107 @@
+import re
+from collections import Counter, deque
+from typing import Deque, List, Optional, Set, Tuple
+from langchain_core.documents import Document
+
+# Cheap local heuristics for follow-up questions: no model call is spent on rewriting,
+# a question that leans on the previous turn borrows that turn's topic terms instead
+
+WORD = re.compile(r"[A-Za-z0-9][A-Za-z0-9_\-']*")
+STOPWORDS = {
+    'a', 'about', 'all', 'also', 'an', 'and', 'any', 'are', 'as', 'at', 'be', 'been', 'but', 'by', 'can', 'could',
+    'did', 'do', 'does', 'for', 'from', 'give', 'had', 'has', 'have', 'how', 'i', 'if', 'in', 'into', 'is', 'it',
+    "it's", 'its', 'me', 'my', 'of', 'on', 'or', 'our', 'please', 'say', 'says', 'should', 'so', 'tell', 'than',
+    'that', 'the', 'their', 'them', 'then', 'there', 'these', 'they', 'this', 'those', 'to', 'us', 'was', 'we',
+    'were', 'what', "what's", 'when', 'where', 'which', 'who', 'why', 'will', 'with', 'would', 'you', 'your'
+}
+# Words that ask for more of the same rather than naming a new topic
+ELABORATION_WORDS = {'again', 'briefly', 'clarify', 'detail', 'details', 'elaborate', 'example', 'examples',
+                     'explain', 'expand', 'further', 'mean', 'means', 'more', 'shorter', 'simpler', 'summarize',
+                     'summary', 'why'}
+REFERENCE_WORDS = {'it', 'its', "it's", 'this', 'these', 'those', 'they', 'them', 'their', 'he',
+                   'she', 'his', 'her', 'same', 'above', 'previous', 'former', 'latter'}
+FOLLOW_UP_OPENERS = ('what about', 'how about', 'and ', 'also ', 'but ', 'what else', 'anything else', 'so ')
+TOPIC_TERMS = 8
+
+def tokenize(text: str) -> List[str]:
+    return [word.lower() for word in WORD.findall(text)]
+
+def content_terms(text: str) -> List[str]:
+    return [word for word in tokenize(text) if word not in STOPWORDS]
+
+class ConversationMemory:
+    def __init__(self, max_turns: int = 4, summary_max_chars: int = 2000):
+        if max_turns < 1:
+            raise ValueError("max_turns must be at least 1")
+
+        self.max_turns = max_turns
+        self.summary_max_chars = summary_max_chars
+        self.turns: Deque[Tuple[str, str]] = deque()
+        self.summary = ""
+        self.topic_terms: List[str] = []
+        self.last_question = ""
+        self.last_filter: Optional[dict] = None
+        self.last_documents: List[Document] = []
+
+    def is_follow_up(self, question: str) -> bool:
+        if not self.turns:
+            return False
+        words = tokenize(question)
+        lowered = question.strip().lower()
+        return (
+            lowered.startswith(FOLLOW_UP_OPENERS)
+            or bool(REFERENCE_WORDS.intersection(words))
+            # Only asks for more of the same, e.g. "explain in more detail"
+            or not set(content_terms(question)) - ELABORATION_WORDS
+        )
+
+    def condense(self, question: str) -> Tuple[str, bool]:
+        # Standalone form of the question used for retrieval
+        if not self.is_follow_up(question):
+            return question, False
+        present = set(content_terms(question))
+        borrowed = [term for term in self.topic_terms if term not in present]
+        if not borrowed:
+            return question, True
+        return f"{question} ({' '.join(borrowed)})", True
+
+    def can_reuse_documents(self, question: str, filter: Optional[dict] = None) -> bool:
+        # Same topic when a follow-up names nothing beyond what the last retrieval was about
+        if not self.last_documents or filter != self.last_filter or not self.is_follow_up(question):
+            return False
+        new_terms: Set[str] = set(content_terms(question)) - ELABORATION_WORDS - REFERENCE_WORDS
+        return new_terms.issubset(self.topic_terms)
+
+    def history_text(self) -> str:
+        parts = []
+        if self.summary:
+            parts.append(f"Summary of earlier conversation: {self.summary}")
+        for question, answer in self.turns:
+            parts.append(f"User: {question}\nAssistant: {answer}")
+        return "\n".join(parts)
+
+    @staticmethod
+    def _summarize_turn(question: str, answer: str) -> str:
+        first_sentence = re.split(r'(?<=[.!?])\s', answer.strip(), maxsplit=1)[0]
+        return f"Asked '{question.strip()}'; answered: {first_sentence[:200]}"
+
+    def add_turn(self, question: str, answer: str, standalone_question: str, documents: List[Document], filter: Optional[dict] = None):
+        self.turns.append((question, answer))
+        while len(self.turns) > self.max_turns:
+            # Turns leaving the window are folded into a bounded running summary
+            summary = f"{self.summary} {self._summarize_turn(*self.turns.popleft())}".strip()
+            self.summary = summary[-self.summary_max_chars:]
+
+        counts = Counter(content_terms(standalone_question))
+        self.topic_terms = [term for term, _ in counts.most_common(TOPIC_TERMS)]
+        self.last_question = standalone_question
+        self.last_filter = filter
+        self.last_documents = documents
+
+    def clear(self):
+        self.turns.clear()
+        self.summary = ""
+        self.topic_terms = []
+        self.last_question = ""
+        self.last_filter = None
+        self.last_documents = []
@@ -1,32 +1,75 @@
+import hashlib
 import logging
-from typing import List, Optional
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.document_loaders.text import TextLoader
+import multiprocessing as mp
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 from langchain_core.documents import Document
 
 from .config import Config
+from .loaders import load_csv, load_html, load_markdown, load_pdf, load_text
+from .text_splitter import FastRecursiveTextSplitter
 
 logger = logging.getLogger(__name__)
 
+Loader = Callable[[str, str], Iterator[Document]]
+
+# Positional metadata that records a range once consecutive records are packed together
+RECORD_POSITION_KEYS = ('row', 'page', 'section_index')
+RECORD_SEPARATOR = "\n\n"
+
+def _process_in_worker(task: Tuple[int, int, str, Optional[str], Optional[List[str]]]) -> List[Document]:
+    chunk_size, chunk_overlap, file_path, filename, tags = task
+    return DocumentProcessor(chunk_size=chunk_size, chunk_overlap=chunk_overlap).process_document(file_path, filename=filename, tags=tags)
+
 class DocumentProcessor:
+    # Loaders must be registered at import time to be visible in parse worker processes
+    LOADER_REGISTRY: Dict[str, Loader] = {
+        'txt': load_text,
+        'md': load_markdown,
+        'markdown': load_markdown,
+        'html': load_html,
+        'htm': load_html,
+        'csv': load_csv,
+        'pdf': load_pdf
+    }
+
     def __init__(self, chunk_size: Optional[int] = None, chunk_overlap: Optional[int] = None):
        config = Config.get_doc_processing_config()
        self.chunk_size = chunk_size  or config['chunk_size']
        self.chunk_overlap = chunk_overlap or config['chunk_overlap']
-       self.text_splitter = RecursiveCharacterTextSplitter(
+       self.text_splitter = FastRecursiveTextSplitter(
            chunk_size=self.chunk_size,
            chunk_overlap=self.chunk_overlap,
-           length_function=len,
            separators=["\n\n", "\n", " ", ""]
          )
 
-    def load_document(self, file_path: str,  encoding: Optional[str] = None) -> List[Document]:
+    @classmethod
+    def register_loader(cls, file_type: str, loader: Loader):
+        cls.LOADER_REGISTRY[file_type.lower().lstrip('.')] = loader
+
+    @staticmethod
+    def get_file_type(file_path: str) -> str:
+        return os.path.splitext(file_path)[1].lower().lstrip('.')
+
+    def get_loader(self, file_type: str) -> Loader:
+        loader = self.LOADER_REGISTRY.get(file_type)
+        if loader is None:
+            raise ValueError(f"Unsupported file type: '{file_type}'")
+        return loader
+
+    def iter_document(self, file_path: str, encoding: Optional[str] = None, file_type: Optional[str] = None) -> Iterator[Document]:
+        config = Config.get_doc_processing_config()
+        encoding = encoding or config['encoding']
+        loader = self.get_loader(file_type or self.get_file_type(file_path))
+        logger.info(f"Loading document from {file_path}")
+        return loader(file_path, encoding)
+
+    def load_document(self, file_path: str,  encoding: Optional[str] = None, file_type: Optional[str] = None) -> List[Document]:
         try:
-            config = Config.get_doc_processing_config()
-            encoding = encoding or config['encoding']
-            logger.info(f"Loading document from {file_path}")
-            loader = TextLoader(file_path, encoding=encoding)
-            documents = loader.load()
+            documents = list(self.iter_document(file_path, encoding=encoding, file_type=file_type))
             logger.info(f"Successfully loaded {len(documents)} document(s)")
             return documents
         
@@ -45,10 +88,71 @@ class DocumentProcessor:
             logger.error(f"Error chunking documents: {e}")
             raise e
         
-    def process_document(self, file_path: str) -> List[Document]:
+    @staticmethod
+    def compute_doc_id(file_path: str) -> str:
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()[:16]
+
+    @staticmethod
+    def tag_key(tag: str) -> str:
+        return "tag_" + re.sub(r'[^a-z0-9]+', '_', tag.strip().lower()).strip('_')
+
+    def annotate_chunks(self, chunks: List[Document], doc_id: str, filename: str, tags: Optional[List[str]] = None) -> List[Document]:
+        ingested_at = int(time.time())
+        tags = [tag.strip() for tag in (tags or []) if tag.strip()]
+
+        for position, chunk in enumerate(chunks):
+            chunk.metadata.update({
+                'doc_id': doc_id,
+                'filename': filename,
+                'chunk_index': position,
+                'ingested_at': ingested_at,
+                'tags': ",".join(tags)
+            })
+            # One boolean key per tag so tags can be matched with Chroma's $eq filters
+            for tag in tags:
+                chunk.metadata[self.tag_key(tag)] = True
+
+        return chunks
+
+    def _merge_records(self, records: List[Document]) -> Document:
+        if len(records) == 1:
+            return records[0]
+        metadata = dict(records[0].metadata)
+        for key in RECORD_POSITION_KEYS:
+            if key in records[-1].metadata and records[-1].metadata[key] != metadata.get(key):
+                metadata[f"{key}_end"] = records[-1].metadata[key]
+        return Document(page_content=RECORD_SEPARATOR.join(record.page_content for record in records), metadata=metadata)
+
+    def pack_records(self, records: Iterator[Document]) -> Iterator[Document]:
+        # Consecutive small records (CSV rows, short sections or pages) are grouped up to chunk_size
+        # so a large table does not turn into one tiny chunk per row
+        buffer: List[Document] = []
+        buffered = 0
+        for record in records:
+            size = len(record.page_content)
+            if buffer and (size >= self.chunk_size or buffered + len(RECORD_SEPARATOR) + size > self.chunk_size):
+                yield self._merge_records(buffer)
+                buffer, buffered = [], 0
+            if size >= self.chunk_size:
+                yield record
+                continue
+            buffered += (len(RECORD_SEPARATOR) if buffer else 0) + size
+            buffer.append(record)
+        if buffer:
+            yield self._merge_records(buffer)
+
+    def process_document(self, file_path: str, filename: Optional[str] = None, tags: Optional[List[str]] = None) -> List[Document]:
         try:
-            documents = self.load_document(file_path)
-            chunks = self.chunk_documents(documents)
+            file_type = self.get_file_type(filename or file_path)
+            chunks = []
+            # Pages, sections and rows are chunked as they stream in rather than loaded up front
+            for record in self.pack_records(self.iter_document(file_path, file_type=file_type)):
+                chunks.extend(self.text_splitter.split_documents([record]))
+            chunks = self.annotate_chunks(chunks, self.compute_doc_id(file_path), filename or os.path.basename(file_path), tags)
             logger.info(f"Document processing completed: {len(chunks)} chunks created")
             return chunks
         
@@ -56,6 +160,25 @@ class DocumentProcessor:
             logger.error(f"Error processing document: {e}")
             raise e
         
+    def process_documents(self, file_paths: List[str], filenames: Optional[List[str]] = None, tags: Optional[List[str]] = None, max_workers: Optional[int] = None) -> List[List[Document]]:
+        try:
+            filenames = filenames or [None] * len(file_paths)
+            max_workers = min(max_workers or Config.get_doc_processing_config()['parse_workers'], len(file_paths), os.cpu_count() or 1)
+            if max_workers <= 1:
+                return [self.process_document(path, filename=name, tags=tags) for path, name in zip(file_paths, filenames)]
+
+            logger.info(f"Processing {len(file_paths)} document(s) across {max_workers} parse worker(s)")
+            tasks = [(self.chunk_size, self.chunk_overlap, path, name, tags) for path, name in zip(file_paths, filenames)]
+            # Spawned so workers never inherit the parent's model threads or locks
+            with ProcessPoolExecutor(max_workers=max_workers, mp_context=mp.get_context('spawn')) as executor:
+                results = list(executor.map(_process_in_worker, tasks))
+            logger.info(f"Document processing completed: {sum(len(chunks) for chunks in results)} chunks created")
+            return results
+
+        except Exception as e:
+            logger.error(f"Error processing documents: {e}")
+            raise e
+        
     def get_document_stats(self, chunks: List[Document]) -> dict:
         if not chunks:
             return {
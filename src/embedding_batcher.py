@@ -0,0 +1,136 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+def embed_queries(embeddings: Embeddings, texts: List[str]) -> List[List[float]]:
+    # Queries must go through the model's query path (query_encode_kwargs, instruction prompts),
+    # not embed_documents. HuggingFaceEmbeddings.embed_query is _embed([text], <query kwargs>),
+    # so several queries can share that one call; other models embed them one at a time.
+    encode = getattr(embeddings, '_embed', None)
+    query_kwargs = getattr(embeddings, 'query_encode_kwargs', None)
+    if callable(encode) and query_kwargs is not None:
+        return encode(texts, query_kwargs or embeddings.encode_kwargs)
+    return [embeddings.embed_query(text) for text in texts]
+
+class MicroBatchEmbedder(Embeddings):
+    def __init__(self, embeddings: Embeddings, max_wait_ms: float = 5.0, max_batch_size: int = 32):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        if max_wait_ms < 0:
+            raise ValueError("max_wait_ms must not be negative")
+
+        self.embeddings = embeddings
+        self.max_wait_ms = max_wait_ms
+        self.max_batch_size = max_batch_size
+        self._queue: "queue.Queue[Optional[Tuple[str, Future]]]" = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._total_requests = 0
+        self._total_batches = 0
+        self._max_observed_batch = 0
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="embedding-micro-batcher", daemon=True)
+        self._worker.start()
+        logger.info(f"Micro-batch embedder started (max_wait_ms={max_wait_ms}, max_batch_size={max_batch_size})")
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.submit(text).result()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        # Document ingests are already batched by the caller
+        return self.embeddings.embed_documents(texts)
+
+    def submit(self, text: str) -> Future:
+        if self._closed:
+            raise RuntimeError("Micro-batch embedder is closed")
+
+        future: Future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def _collect_batch(self, first: Tuple[str, Future]) -> Tuple[List[Tuple[str, Future]], bool]:
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait_ms / 1000.0
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+
+        return batch, False
+
+    def _run(self):
+        stop = False
+        while not stop:
+            first = self._queue.get()
+            if first is None:
+                break
+
+            batch, stop = self._collect_batch(first)
+            batch = [(text, future) for text, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            try:
+                vectors = embed_queries(self.embeddings, [text for text, _ in batch])
+                for (_, future), vector in zip(batch, vectors):
+                    future.set_result(vector)
+
+            except Exception as e:
+                logger.error(f"Error generating batched query embeddings: {e}")
+                for _, future in batch:
+                    future.set_exception(e)
+
+            with self._stats_lock:
+                self._total_requests += len(batch)
+                self._total_batches += 1
+                self._max_observed_batch = max(self._max_observed_batch, len(batch))
+
+        # Fail anything that raced in behind the shutdown sentinel
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None and item[1].set_running_or_notify_cancel():
+                item[1].set_exception(RuntimeError("Micro-batch embedder is closed"))
+
+    def get_stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                'total_requests': self._total_requests,
+                'total_batches': self._total_batches,
+                'avg_batch_size': self._total_requests / self._total_batches if self._total_batches else 0,
+                'max_batch_size_observed': self._max_observed_batch,
+                'max_wait_ms': self.max_wait_ms,
+                'max_batch_size': self.max_batch_size
+            }
+
+    def close(self, timeout: Optional[float] = None):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._worker.join(timeout)
+        logger.info("Micro-batch embedder stopped")
+
+_shared_batchers: Dict[Hashable, MicroBatchEmbedder] = {}
+_shared_batchers_lock = threading.Lock()
+
+def get_shared_batcher(key: Hashable, factory: Callable[[], Embeddings], max_wait_ms: float = 5.0, max_batch_size: int = 32) -> MicroBatchEmbedder:
+    # One batcher per model for the whole process, so queries from every pipeline and
+    # Streamlit session land in the same batches
+    with _shared_batchers_lock:
+        if key not in _shared_batchers:
+            _shared_batchers[key] = MicroBatchEmbedder(factory(), max_wait_ms=max_wait_ms, max_batch_size=max_batch_size)
+        return _shared_batchers[key]
@@ -4,12 +4,15 @@ from typing import List, Optional
 from langchain_core.documents import Document
 from langchain_huggingface import HuggingFaceEmbeddings
 
+from .embedding_batcher import MicroBatchEmbedder, embed_queries, get_shared_batcher
+
 logger = logging.getLogger(__name__)
 
 class EmbeddingManager:
     def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2"): # text-embedding-3-small
         self.model_name = model_name
         self.embeddings = None
+        self.query_batcher = None
         self._initialize_embeddings()
         
     def _initialize_embeddings(self):
@@ -26,6 +29,11 @@ class EmbeddingManager:
         if self.embeddings is None:
             self._initialize_embeddings()
         return self.embeddings
+
+    def get_batched_embeddings(self, max_wait_ms: float = 5.0, max_batch_size: int = 32) -> MicroBatchEmbedder:
+        if self.query_batcher is None:
+            self.query_batcher = get_shared_batcher(self.model_name, self.get_embeddings, max_wait_ms=max_wait_ms, max_batch_size=max_batch_size)
+        return self.query_batcher
     
     def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
         try:
@@ -38,8 +46,19 @@ class EmbeddingManager:
             logger.error(f"Error generating embeddings: {e}")
             raise e
         
+    def generate_query_embeddings(self, texts: List[str]) -> List[List[float]]:
+        try:
+            logger.info(f"Generating query embeddings for {len(texts)} question(s)")
+            return embed_queries(self.embeddings, texts)
+
+        except Exception as e:
+            logger.error(f"Error generating query embeddings: {e}")
+            raise e
+
     def generate_single_embedding(self, text: str) -> List[float]:
         try:
+            if self.query_batcher is not None:
+                return self.query_batcher.embed_query(text)
             embedding = self.embeddings.embed_query(text)
             return embedding
         
@@ -60,7 +79,8 @@ class EmbeddingManager:
         return {
             'model_name': self.model_name,
             'dimension': self.get_embedding_dimension(),
-            'is_initialized': self.embeddings is not None
+            'is_initialized': self.embeddings is not None,
+            'query_batching': self.query_batcher.get_stats() if self.query_batcher else None
         } 
 
             
\ No newline at end of file
@@ -0,0 +1,167 @@
+import atexit
+import logging
+import multiprocessing as mp
+import os
+import threading
+from multiprocessing import shared_memory
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+# Per-process model handle, loaded once by the pool initializer
+_worker_embeddings = None
+
+def load_huggingface_embeddings(model_name: str) -> Embeddings:
+    from langchain_huggingface import HuggingFaceEmbeddings
+    return HuggingFaceEmbeddings(model=model_name, model_kwargs={'device': 'cpu'})
+
+def _init_worker(model_name: str, threads_per_worker: int, embeddings_factory: Callable[[str], Embeddings]):
+    global _worker_embeddings
+    try:
+        import torch
+        torch.set_num_threads(threads_per_worker)
+    except ImportError:
+        pass
+
+    _worker_embeddings = embeddings_factory(model_name)
+
+def _worker_dimension() -> int:
+    return len(_worker_embeddings.embed_query("test"))
+
+def _embed_shard(task: Tuple[str, str, str, int, int, int]) -> int:
+    text_name, offsets_name, output_name, start, end, dimension = task
+    text_shm = shared_memory.SharedMemory(name=text_name)
+    offsets_shm = shared_memory.SharedMemory(name=offsets_name)
+    output_shm = shared_memory.SharedMemory(name=output_name)
+    try:
+        offsets = np.ndarray((end + 1,), dtype=np.int64, buffer=offsets_shm.buf)
+        buffer = text_shm.buf
+        texts = [bytes(buffer[offsets[i]:offsets[i + 1]]).decode('utf-8') for i in range(start, end)]
+
+        vectors = _worker_embeddings.embed_documents(texts)
+        output = np.ndarray((end, dimension), dtype=np.float32, buffer=output_shm.buf)
+        output[start:end] = np.asarray(vectors, dtype=np.float32)
+        del offsets, output, buffer
+        return end - start
+
+    finally:
+        text_shm.close()
+        offsets_shm.close()
+        output_shm.close()
+
+class EmbeddingWorkerPool:
+    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2", num_workers: Optional[int] = None, batch_size: int = 256, min_texts: int = 512, embeddings_factory: Callable[[str], Embeddings] = load_huggingface_embeddings):
+        self.model_name = model_name
+        # Runs in each spawned worker, so it must be a picklable module-level callable
+        self.embeddings_factory = embeddings_factory
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.min_texts = min_texts
+        self.dimension = None
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _start(self):
+        with self._lock:
+            if self._pool is None:
+                self._spawn()
+
+    def _spawn(self):
+        try:
+            threads_per_worker = max(1, (os.cpu_count() or 1) // self.num_workers)
+            logger.info(f"Starting embedding worker pool: {self.num_workers} worker(s), {threads_per_worker} thread(s) each")
+            # Torch is not fork-safe once initialized, so workers are always spawned
+            context = mp.get_context('spawn')
+            self._pool = context.Pool(
+                processes=self.num_workers,
+                initializer=_init_worker,
+                initargs=(self.model_name, threads_per_worker, self.embeddings_factory)
+            )
+            self.dimension = self._pool.apply(_worker_dimension)
+            logger.info(f"Embedding worker pool ready (dimension={self.dimension})")
+
+        except Exception as e:
+            logger.error(f"Error starting embedding worker pool: {e}")
+            if self._pool is not None:
+                self._pool.terminate()
+                self._pool = None
+            raise e
+
+    def should_use_pool(self, num_texts: int) -> bool:
+        return self.num_workers > 1 and num_texts >= self.min_texts
+
+    def embed_array(self, texts: List[str]) -> np.ndarray:
+        self._start()
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+
+        encoded = [text.encode('utf-8') for text in texts]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(chunk) for chunk in encoded], out=offsets[1:])
+
+        text_shm = shared_memory.SharedMemory(create=True, size=max(1, int(offsets[-1])))
+        offsets_shm = shared_memory.SharedMemory(create=True, size=offsets.nbytes)
+        output_shm = shared_memory.SharedMemory(create=True, size=len(texts) * self.dimension * 4)
+        try:
+            text_shm.buf[:offsets[-1]] = b''.join(encoded)
+            del encoded
+            np.ndarray(offsets.shape, dtype=np.int64, buffer=offsets_shm.buf)[:] = offsets
+
+            tasks = [
+                (text_shm.name, offsets_shm.name, output_shm.name, start, min(start + self.batch_size, len(texts)), self.dimension)
+                for start in range(0, len(texts), self.batch_size)
+            ]
+            logger.info(f"Embedding {len(texts)} text(s) in {len(tasks)} shard(s) across {self.num_workers} worker(s)")
+            completed = sum(self._pool.imap_unordered(_embed_shard, tasks))
+            if completed != len(texts):
+                raise RuntimeError(f"Embedding worker pool returned {completed} of {len(texts)} embeddings")
+
+            output = np.ndarray((len(texts), self.dimension), dtype=np.float32, buffer=output_shm.buf)
+            result = output.copy()
+            del output
+            return result
+
+        finally:
+            for shm in (text_shm, offsets_shm, output_shm):
+                shm.close()
+                shm.unlink()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        try:
+            return self.embed_array(texts).tolist()
+
+        except Exception as e:
+            logger.error(f"Error generating embeddings in worker pool: {e}")
+            raise e
+
+    def close(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.close()
+                self._pool.join()
+                self._pool = None
+                logger.info("Embedding worker pool stopped")
+
+_shared_pools: Dict[Hashable, EmbeddingWorkerPool] = {}
+_shared_pools_lock = threading.Lock()
+
+def get_shared_pool(model_name: str, num_workers: int, batch_size: int = 256, min_texts: int = 512) -> EmbeddingWorkerPool:
+    # One set of worker processes per model for the whole process; each worker holds a full
+    # copy of the model, so pipelines and Streamlit sessions must not start their own
+    with _shared_pools_lock:
+        key = (model_name, num_workers)
+        if key not in _shared_pools:
+            _shared_pools[key] = EmbeddingWorkerPool(model_name=model_name, num_workers=num_workers, batch_size=batch_size, min_texts=min_texts)
+        return _shared_pools[key]
+
+def close_shared_pools():
+    with _shared_pools_lock:
+        pools = list(_shared_pools.values())
+        _shared_pools.clear()
+    for pool in pools:
+        pool.close()
+
+# Worker processes are stopped when the interpreter exits rather than left to the multiprocessing finalizers
+atexit.register(close_shared_pools)
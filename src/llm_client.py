@@ -0,0 +1,181 @@
+import json
+import logging
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Hashable, List, Optional
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+RETRYABLE_ERROR_NAMES = {'ResourceExhausted', 'ServiceUnavailable', 'InternalServerError', 'DeadlineExceeded', 'TooManyRequests'}
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    for attribute in ('status_code', 'code'):
+        code = getattr(error, attribute, None)
+        if isinstance(code, int) and code in RETRYABLE_STATUS_CODES:
+            return True
+    return type(error).__name__ in RETRYABLE_ERROR_NAMES
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: int):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, deadline: Optional[float] = None) -> bool:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+
+            if deadline is not None and now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+class LLMClient:
+    def __init__(self, llm: Any, requests_per_second: float = 5.0, burst: int = 10, max_concurrency: int = 8, max_retries: int = 4, backoff_base_seconds: float = 0.5, backoff_max_seconds: float = 8.0, timeout_seconds: float = 60.0):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        self.llm = llm
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.timeout_seconds = timeout_seconds
+        self.rate_limiter = TokenBucket(requests_per_second, burst)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="llm-client")
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._in_flight_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {'requests': 0, 'coalesced': 0, 'attempts': 0, 'retries': 0, 'timeouts': 0, 'failures': 0}
+        logger.info(f"LLM client initialized (requests_per_second={requests_per_second}, burst={burst}, max_concurrency={max_concurrency}, max_retries={max_retries})")
+
+    @staticmethod
+    def request_key(messages: List[BaseMessage], stop: Optional[List[str]] = None) -> str:
+        return json.dumps([[message.type, message.content] for message in messages] + [stop], default=str)
+
+    def _count(self, stat: str):
+        with self._stats_lock:
+            self._stats[stat] += 1
+
+    def _attempt(self, messages: List[BaseMessage], stop: Optional[List[str]], deadline: float) -> BaseMessage:
+        if not self.rate_limiter.acquire(deadline):
+            raise TimeoutError("LLM call deadline exceeded waiting for the rate limiter")
+        if not self._slots.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            raise TimeoutError("LLM call deadline exceeded waiting for a concurrency slot")
+
+        # The slot is released when the provider call actually returns, so abandoned calls still count against the limit
+        self._count('attempts')
+        future = self._executor.submit(self.llm.invoke, messages, stop=stop)
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FutureTimeoutError:
+            raise TimeoutError("LLM call deadline exceeded")
+
+    def _call(self, messages: List[BaseMessage], stop: Optional[List[str]], deadline: float) -> BaseMessage:
+        attempt = 0
+        while True:
+            try:
+                return self._attempt(messages, stop, deadline)
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise e
+                # Full jitter keeps clients that were throttled together from retrying together
+                delay = random.uniform(0, min(self.backoff_max_seconds, self.backoff_base_seconds * 2 ** attempt))
+                if time.monotonic() + delay >= deadline:
+                    raise e
+                attempt += 1
+                self._count('retries')
+                logger.warning(f"LLM call failed ({type(e).__name__}: {e}), retry {attempt}/{self.max_retries} in {delay:.2f}s")
+                time.sleep(delay)
+
+    def invoke(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, timeout: Optional[float] = None) -> BaseMessage:
+        deadline = time.monotonic() + (timeout if timeout is not None else self.timeout_seconds)
+        key = self.request_key(messages, stop)
+        self._count('requests')
+
+        # Identical concurrent prompts share the first caller's request
+        with self._in_flight_lock:
+            shared = self._in_flight.get(key)
+            if shared is None:
+                future: Future = Future()
+                self._in_flight[key] = future
+
+        if shared is not None:
+            self._count('coalesced')
+            try:
+                return shared.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeoutError:
+                self._count('timeouts')
+                raise TimeoutError("LLM call deadline exceeded waiting for a coalesced request")
+
+        try:
+            result = self._call(messages, stop, deadline)
+            future.set_result(result)
+            return result
+        except Exception as e:
+            self._count('timeouts' if isinstance(e, TimeoutError) else 'failures')
+            future.set_exception(e)
+            raise e
+        finally:
+            with self._in_flight_lock:
+                self._in_flight.pop(key, None)
+
+    def get_stats(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats.update({
+            'requests_per_second': self.rate_limiter.rate,
+            'burst': self.rate_limiter.capacity,
+            'max_concurrency': self.max_concurrency
+        })
+        return stats
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+class ManagedChatModel(BaseChatModel):
+    # LangChain chat model that sends every call through a shared LLMClient
+    client: Any
+
+    @property
+    def _llm_type(self) -> str:
+        return "managed-chat-model"
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        message = self.client.invoke(messages, stop=stop)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+_shared_clients: Dict[Hashable, LLMClient] = {}
+_shared_clients_lock = threading.Lock()
+
+def get_shared_client(key: Hashable, factory: Callable[[], Any], **client_kwargs) -> LLMClient:
+    # One client (and one underlying model connection) per key for the whole process,
+    # so every pipeline and Streamlit session draws from the same rate limit
+    with _shared_clients_lock:
+        if key not in _shared_clients:
+            _shared_clients[key] = LLMClient(factory(), **client_kwargs)
+        return _shared_clients[key]
@@ -0,0 +1,123 @@
+import csv
+import re
+from html.parser import HTMLParser
+from typing import Iterator, List, Optional
+from langchain_core.documents import Document
+
+# Loaders are module-level generators so they can run in worker processes and
+# hand back one page, section or row at a time instead of a whole-file string
+
+READ_BLOCK_SIZE = 64 * 1024
+MARKDOWN_HEADING = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+
+def load_text(file_path: str, encoding: str = 'utf-8') -> Iterator[Document]:
+    # Kept as a single record so plain text chunks exactly as it did with TextLoader
+    with open(file_path, encoding=encoding) as f:
+        yield Document(page_content=f.read(), metadata={'source': file_path})
+
+def load_markdown(file_path: str, encoding: str = 'utf-8') -> Iterator[Document]:
+    section_index = 0
+    title = ""
+    lines: List[str] = []
+    in_code_block = False
+
+    with open(file_path, encoding=encoding) as f:
+        for line in f:
+            if line.lstrip().startswith(("```", "~~~")):
+                in_code_block = not in_code_block
+
+            heading = None if in_code_block else MARKDOWN_HEADING.match(line)
+            if heading and lines:
+                content = "".join(lines).strip()
+                if content:
+                    yield Document(page_content=content, metadata={'source': file_path, 'section': title, 'section_index': section_index})
+                    section_index += 1
+                lines = []
+            if heading:
+                title = heading.group(2)
+            lines.append(line)
+
+    content = "".join(lines).strip()
+    if content:
+        yield Document(page_content=content, metadata={'source': file_path, 'section': title, 'section_index': section_index})
+
+class _HTMLSectionParser(HTMLParser):
+    SKIPPED_TAGS = {'script', 'style', 'head', 'noscript', 'template'}
+    HEADING_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+    BLOCK_TAGS = {'p', 'div', 'br', 'li', 'tr', 'section', 'article', 'blockquote', 'pre', 'table', 'ul', 'ol'}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.sections = []
+        self.title = ""
+        self.parts = []
+        self.heading_parts: Optional[List[str]] = None
+        self.skip_depth = 0
+
+    def flush(self):
+        content = re.sub(r'[ \t]+', ' ', "".join(self.parts))
+        content = re.sub(r'\s*\n\s*', '\n', content).strip()
+        if content:
+            self.sections.append((self.title, content))
+        self.parts = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIPPED_TAGS:
+            self.skip_depth += 1
+        elif tag in self.HEADING_TAGS:
+            self.flush()
+            self.heading_parts = []
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIPPED_TAGS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+        elif tag in self.HEADING_TAGS and self.heading_parts is not None:
+            self.title = " ".join("".join(self.heading_parts).split())
+            self.parts.append("\n")
+            self.heading_parts = None
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if self.skip_depth:
+            return
+        self.parts.append(data)
+        if self.heading_parts is not None:
+            self.heading_parts.append(data)
+
+def load_html(file_path: str, encoding: str = 'utf-8') -> Iterator[Document]:
+    parser = _HTMLSectionParser()
+    section_index = 0
+
+    with open(file_path, encoding=encoding) as f:
+        for block in iter(lambda: f.read(READ_BLOCK_SIZE), ''):
+            parser.feed(block)
+            for title, content in parser.sections:
+                yield Document(page_content=content, metadata={'source': file_path, 'section': title, 'section_index': section_index})
+                section_index += 1
+            parser.sections = []
+
+    parser.close()
+    parser.flush()
+    for title, content in parser.sections:
+        yield Document(page_content=content, metadata={'source': file_path, 'section': title, 'section_index': section_index})
+        section_index += 1
+
+def load_csv(file_path: str, encoding: str = 'utf-8') -> Iterator[Document]:
+    with open(file_path, encoding=encoding, newline='') as f:
+        reader = csv.DictReader(f)
+        for row_index, row in enumerate(reader):
+            content = "\n".join(f"{column}: {value}" for column, value in row.items() if column is not None and value)
+            if content:
+                yield Document(page_content=content, metadata={'source': file_path, 'row': row_index})
+
+def load_pdf(file_path: str, encoding: str = 'utf-8') -> Iterator[Document]:
+    from pypdf import PdfReader
+
+    reader = PdfReader(file_path)
+    for page_number, page in enumerate(reader.pages, start=1):
+        content = (page.extract_text() or "").strip()
+        if content:
+            yield Document(page_content=content, metadata={'source': file_path, 'page': page_number})
@@ -1,14 +1,22 @@
 import logging
 import os
-from typing import List, Optional, Tuple
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
 from dotenv import load_dotenv
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.chains import RetrievalQA
 from langchain_core.documents import Document
 import google.generativeai as genai
 
+from .config import Config
+from .conversation import ConversationMemory
 from .document_processor import DocumentProcessor
 from .embedding_manager import EmbeddingManager
+from .embedding_pool import get_shared_pool
+from .llm_client import ManagedChatModel, get_shared_client
+from .snapshot import SnapshotReplica, export_snapshot
 from .vector_store import VectorStoreManager
 
 load_dotenv()
@@ -30,8 +38,11 @@ class RAGPipeline:
         self.temperature = temperature
         self.document_processor = None
         self.embedding_manager = None
+        self.embedding_pool = None
+        self.llm_client = None
         self.llm = None
         self.qa_chain = None
+        self.last_ingest_stats = None
 
         self._initialize_components()
 
@@ -43,9 +54,47 @@ class RAGPipeline:
 
             self.document_processor = DocumentProcessor(chunk_size=self.chunk_size, chunk_overlap=self.chunk_overlap)
             self.embedding_manager = EmbeddingManager(model_name=self.embedding_model)
-            self.vector_store_manager = VectorStoreManager(persist_directory=self.persist_directory, embedding_function=self.embedding_manager.get_embeddings())
-            self.vector_store_manager.initialize_vector_store()
-            self.llm = ChatGoogleGenerativeAI(model="gemini-1.5-flash", temperature=self.temperature)
+            embedding_config = Config.get_embedding_config()
+            if embedding_config['query_micro_batching']:
+                embedding_function = self.embedding_manager.get_batched_embeddings(
+                    max_wait_ms=embedding_config['query_batch_max_wait_ms'],
+                    max_batch_size=embedding_config['query_batch_max_size']
+                )
+            else:
+                embedding_function = self.embedding_manager.get_embeddings()
+            if embedding_config['workers'] > 1:
+                # Worker processes are shared by every pipeline in the process and stopped at exit
+                self.embedding_pool = get_shared_pool(
+                    model_name=self.embedding_model,
+                    num_workers=embedding_config['workers'],
+                    batch_size=embedding_config['worker_batch_size'],
+                    min_texts=embedding_config['pool_min_texts']
+                )
+            vector_store_config = Config.get_vector_store_config()
+            if vector_store_config['snapshot_path']:
+                # Read-only replica serving a snapshot exported from the primary
+                self.vector_store_manager = SnapshotReplica(vector_store_config['snapshot_path'], embedding_function=embedding_function, warm=vector_store_config['snapshot_warm'])
+            else:
+                self.vector_store_manager = VectorStoreManager(persist_directory=self.persist_directory, embedding_function=embedding_function, embedding_pool=self.embedding_pool)
+                self.vector_store_manager.initialize_vector_store()
+            # Pipelines share one rate-limited, retrying client per model and temperature
+            llm_config = Config.get_llm_config()
+            self.llm_client = get_shared_client(
+                (llm_config['model'], self.temperature),
+                # Retries and timeouts are handled by the client, so the model makes a single attempt
+                lambda: ChatGoogleGenerativeAI(model=llm_config['model'], temperature=self.temperature, max_retries=1, timeout=llm_config['timeout_seconds']),
+                requests_per_second=llm_config['requests_per_second'],
+                burst=llm_config['burst'],
+                max_concurrency=llm_config['max_concurrency'],
+                max_retries=llm_config['max_retries'],
+                backoff_base_seconds=llm_config['backoff_base_seconds'],
+                backoff_max_seconds=llm_config['backoff_max_seconds'],
+                timeout_seconds=llm_config['timeout_seconds']
+            )
+            self.llm = ManagedChatModel(client=self.llm_client)
+            # Replicas and persisted collections can answer before anything new is uploaded
+            if self.vector_store_manager.get_collection_stats()['total_documents']:
+                self._initialize_qa_chain()
 
             logger.info("RAG Pipeline components initialized successfully") 
 
@@ -53,27 +102,36 @@ class RAGPipeline:
             logger.error(f"Error initializing RAG Pipeline components: {e}")
             raise e
 
-    def process_document(self, file_path: str) -> bool: 
+    def _index_chunks(self, chunks: List[Document]) -> bool:
+        if not chunks:
+            logger.error("No chunks generated from document")
+            return False
+        self.last_ingest_stats = self.document_processor.get_document_stats(chunks)
+        # Add chunks to vector store
+        success = self.vector_store_manager.add_documents(chunks)
+        if not success:
+            logger.error("Failed to add chunks to vector store")
+            return False
+        # Initialize QA chain
+        self._initialize_qa_chain()
+        return True
+
+    def _initialize_qa_chain(self):
+        retriever = self.vector_store_manager.get_retriever()
+        self.qa_chain = RetrievalQA.from_chain_type(
+            llm=self.llm,
+            chain_type="stuff",
+            retriever=retriever,
+            return_source_documents=True
+        )
+
+    def process_document(self, file_path: str, filename: Optional[str] = None, tags: Optional[List[str]] = None) -> bool: 
         try:
             logger.info(f"Processing document: {file_path}")
             # Chunk document
-            chunks = self.document_processor.process_document(file_path)
-            if not chunks:
-                logger.error("No chunks generated from document")
-                return False
-            # Add chunks to vector store
-            success = self.vector_store_manager.add_documents(chunks)
-            if not success:
-                logger.error("Failed to add chunks to vector store")
+            chunks = self.document_processor.process_document(file_path, filename=filename, tags=tags)
+            if not self._index_chunks(chunks):
                 return False
-            # Initialize QA chain
-            retriever = self.vector_store_manager.get_retriever()
-            self.qa_chain = RetrievalQA.from_chain_type(
-                llm=self.llm,
-                chain_type="stuff",
-                retriever=retriever,
-                return_source_documents=True
-            )
 
             logger.info(f"Document processed successfully")
             return True
@@ -81,13 +139,39 @@ class RAGPipeline:
         except Exception as e:
             logger.error(f"Error processing document: {e}")
             return False
+
+    def process_documents(self, file_paths: List[str], filenames: Optional[List[str]] = None, tags: Optional[List[str]] = None) -> bool:
+        try:
+            logger.info(f"Processing {len(file_paths)} document(s)")
+            # Files are parsed in parallel, then embedded and indexed as one batch
+            results = self.document_processor.process_documents(file_paths, filenames=filenames, tags=tags)
+            if not self._index_chunks([chunk for chunks in results for chunk in chunks]):
+                return False
+
+            logger.info(f"Documents processed successfully")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error processing documents: {e}")
+            return False
         
-    def query(self, question: str) -> Tuple[str, List[Document]]:
+    def query(self, question: str, filter: Optional[dict] = None, conversation: Optional[ConversationMemory] = None) -> Tuple[str, List[Document]]:
         try:
             if not self.qa_chain:
                 return "Please process a document first before asking questions.", []
+            if conversation is not None:
+                return self._query_conversational(question, filter, conversation)
             logger.info(f"Processing query: '{question}'")
-            response = self.qa_chain({"query": question})
+            qa_chain = self.qa_chain
+            if filter:
+                # Filtered queries get a one-off chain over the restricted retriever
+                qa_chain = RetrievalQA.from_chain_type(
+                    llm=self.llm,
+                    chain_type="stuff",
+                    retriever=self.vector_store_manager.get_retriever({"filter": filter}),
+                    return_source_documents=True
+                )
+            response = qa_chain({"query": question})
             answer = response['result']
             source_docs = response.get("source_documents", [])
             logger.info(f"Query completed successfully. Answer length: {len(answer)}")
@@ -97,6 +181,100 @@ class RAGPipeline:
             logger.error(f"Error processing query: {e}")
             return f"Error processing query: {str(e)}", []
         
+    def _query_conversational(self, question: str, filter: Optional[dict], conversation: ConversationMemory) -> Tuple[str, List[Document]]:
+        standalone_question, is_follow_up = conversation.condense(question)
+        logger.info(f"Processing conversational query: '{standalone_question}' (follow-up: {is_follow_up})")
+
+        if conversation.can_reuse_documents(question, filter):
+            # Same topic as the last turn, answer from the chunks it already retrieved
+            logger.info("Reusing previous turn's retrieved chunks")
+            source_docs = conversation.last_documents
+        else:
+            source_docs = self.vector_store_manager.similarity_search(standalone_question, k=Config.get_vector_store_config()['retrieval_k'], filter=filter)
+
+        history = conversation.history_text()
+        prompt_question = f"{history}\nFollow-up question: {question}" if history else question
+        response = self.qa_chain.combine_documents_chain({"input_documents": source_docs, "question": prompt_question})
+        answer = response['output_text']
+        conversation.add_turn(question, answer, standalone_question, source_docs, filter)
+        logger.info(f"Query completed successfully. Answer length: {len(answer)}")
+        return answer, source_docs
+
+    def query_batch(self, questions: List[str], filter: Optional[dict] = None, max_concurrency: Optional[int] = None) -> Iterator[dict]:
+        # Yields one result per question as soon as its answer is ready, not in input order
+        if not self.qa_chain:
+            raise ValueError("Please process a document first before asking questions.")
+
+        batch_start = time.perf_counter()
+        positions: Dict[str, List[int]] = {}
+        for index, question in enumerate(questions):
+            positions.setdefault(question, []).append(index)
+        unique_questions = list(positions)
+        logger.info(f"Processing batch of {len(questions)} question(s), {len(unique_questions)} unique")
+        if not unique_questions:
+            return
+
+        # All questions are embedded in one pass and searched as one query matrix;
+        # embedding or retrieval failures propagate, since no question could be answered
+        start = time.perf_counter()
+        query_embeddings = np.asarray(self.embedding_manager.generate_query_embeddings(unique_questions), dtype=np.float32)
+        embed_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        matches = self.vector_store_manager.similarity_search_by_vectors_with_score(query_embeddings, k=Config.get_vector_store_config()['retrieval_k'], filter=filter)
+        retrieve_ms = (time.perf_counter() - start) * 1000
+        unique_chunks = len({id(doc) for results in matches for doc, _ in results})
+        logger.info(f"Retrieved {unique_chunks} unique chunk(s) for the batch")
+
+        def answer(index: int) -> Tuple[int, str, Optional[str], float]:
+            start = time.perf_counter()
+            if not matches[index]:
+                # Never let the LLM answer an audit question without any context
+                return index, "", "No matching chunks were retrieved", 0.0
+            try:
+                response = self.qa_chain.combine_documents_chain({"input_documents": [doc for doc, _ in matches[index]], "question": unique_questions[index]})
+                return index, response['output_text'], None, (time.perf_counter() - start) * 1000
+            except Exception as e:
+                logger.error(f"Error answering batch question {index}: {e}")
+                return index, "", str(e), (time.perf_counter() - start) * 1000
+
+        max_workers = max_concurrency or Config.get_llm_config()['max_concurrency']
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="query-batch") as executor:
+            futures = [executor.submit(answer, index) for index in range(len(unique_questions))]
+            for future in as_completed(futures):
+                index, text, error, llm_ms = future.result()
+                sources = [
+                    {'id': doc.id, 'doc_id': doc.metadata.get('doc_id'), 'filename': doc.metadata.get('filename'), 'chunk_index': doc.metadata.get('chunk_index'), 'score': score}
+                    for doc, score in matches[index]
+                ]
+                for position in positions[unique_questions[index]]:
+                    yield {
+                        'index': position,
+                        'question': unique_questions[index],
+                        'answer': text,
+                        'error': error,
+                        'sources': sources,
+                        'timings_ms': {
+                            # Embedding and retrieval run once for the batch and are shared out per question
+                            'embed': embed_ms / len(unique_questions),
+                            'retrieve': retrieve_ms / len(unique_questions),
+                            'llm': llm_ms,
+                            'total': (time.perf_counter() - batch_start) * 1000
+                        }
+                    }
+
+        logger.info(f"Batch completed in {time.perf_counter() - batch_start:.2f}s")
+
+    def export_snapshot(self, path: str) -> bool:
+        try:
+            if isinstance(self.vector_store_manager, SnapshotReplica):
+                raise ValueError("Snapshots are exported from the primary vector store, not a replica")
+            export_snapshot(self.vector_store_manager, path)
+            return True
+
+        except Exception as e:
+            logger.error(f"Error exporting snapshot: {e}")
+            return False
+
     def get_system_info(self) -> dict:
         try:
             info = {
@@ -118,6 +296,10 @@ class RAGPipeline:
             if self.embedding_manager:
                 info['embedding_info'] = self.embedding_manager.get_model_info()
             
+            # Add LLM client stats
+            if self.llm_client:
+                info['llm_client_stats'] = self.llm_client.get_stats()
+
             # Add vector store stats
             if self.vector_store_manager:
                 info['vector_store_stats'] = self.vector_store_manager.get_collection_stats()
@@ -132,9 +314,10 @@ class RAGPipeline:
          try:
             logger.info("Clearing knowledge base")
             
-            # Clear vector store
-            if self.vector_store_manager:
-                self.vector_store_manager.clear_vector_store()
+            # Clear vector store; read-only replicas refuse, and then keep answering from their snapshot
+            if self.vector_store_manager and not self.vector_store_manager.clear_vector_store():
+                logger.error("Vector store was not cleared, keeping the knowledge base")
+                return False
             
             # Reset QA chain
             self.qa_chain = None
@@ -146,6 +329,16 @@ class RAGPipeline:
             logger.error(f"Error clearing knowledge base: {e}")
             return False
          
+    def close(self):
+        # Releases this pipeline's own resources; the shared LLM client, query batcher and
+        # embedding worker pool stay up for the other pipelines in the process
+        if isinstance(self.vector_store_manager, SnapshotReplica):
+            self.vector_store_manager.close()
+        self.vector_store_manager = None
+        self.embedding_pool = None
+        self.qa_chain = None
+        self.llm = None
+
     def is_ready(self) -> bool:
         return (
             self.document_processor is not None and
@@ -0,0 +1,581 @@
+import json
+import logging
+import math
+import mmap
+import os
+import struct
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from .config import Config
+from .vector_store import FilteredRetriever, VectorStoreManager, top_k_indices
+
+logger = logging.getLogger(__name__)
+
+# Single-file layout, all sections 64-byte aligned:
+#   magic | embeddings float32[count, dim] | squared norms float32[count] | records (one JSON object per chunk)
+#   | record offsets uint64[count + 1] | metadata columns | IVF centroids float32[lists, dim] | list offsets int64[lists + 1]
+#   | header JSON | header length uint64 | magic
+# Rows are ordered by IVF list, so each list is a contiguous row range. Scalar metadata is stored as
+# columns (float64 numbers, packed bitsets for booleans, int32 dictionary codes for strings) so
+# filters are evaluated with numpy instead of decoding records.
+SNAPSHOT_MAGIC = b"RAGSNAP2"
+SNAPSHOT_VERSION = 2
+ALIGNMENT = 64
+EXPORT_BATCH_SIZE = 5000
+SEARCH_BLOCK_ELEMENTS = 8 * 1024 * 1024
+IVF_MIN_ROWS = 10000
+IVF_TRAIN_SAMPLE = 50000
+IVF_TRAIN_ITERATIONS = 10
+
+def _pad(f):
+    padding = -f.tell() % ALIGNMENT
+    if padding:
+        f.write(b"\0" * padding)
+
+def _write_section(f, array: np.ndarray) -> int:
+    _pad(f)
+    offset = f.tell()
+    f.write(np.ascontiguousarray(array).tobytes())
+    return offset
+
+def _nearest_centroids(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    centroid_norms = (centroids ** 2).sum(axis=1)
+    block_rows = max(1, SEARCH_BLOCK_ELEMENTS // len(centroids))
+    assignments = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), block_rows):
+        block = np.asarray(vectors[start:start + block_rows], dtype=np.float32)
+        assignments[start:start + len(block)] = (centroid_norms[None, :] - 2 * block @ centroids.T).argmin(axis=1)
+    return assignments
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+def train_ivf(vectors: np.ndarray, lists: int, metric: str, seed: int = 0) -> np.ndarray:
+    # Plain k-means on a sample; cosine collections are clustered on the unit sphere
+    rng = np.random.default_rng(seed)
+    sample = np.asarray(vectors[np.sort(rng.choice(len(vectors), min(len(vectors), IVF_TRAIN_SAMPLE), replace=False))], dtype=np.float32)
+    if metric == 'cosine':
+        sample = _normalize(sample)
+
+    centroids = sample[rng.choice(len(sample), lists, replace=False)].copy()
+    for _ in range(IVF_TRAIN_ITERATIONS):
+        assignments = _nearest_centroids(sample, centroids)
+        order = np.argsort(assignments, kind='stable')
+        counts = np.bincount(assignments, minlength=lists)
+        filled = np.flatnonzero(counts)
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])[filled]
+        centroids[filled] = np.add.reduceat(sample[order], starts, axis=0) / counts[filled, None]
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            centroids[empty] = sample[rng.choice(len(sample), len(empty), replace=False)]
+        if metric == 'cosine':
+            centroids = _normalize(centroids)
+    return centroids.astype(np.float32)
+
+def _column_kind(value_types: set) -> Optional[str]:
+    if value_types <= {bool}:
+        return 'bool'
+    if value_types <= {bool, int, float}:
+        return 'number'
+    if value_types <= {str}:
+        return 'string'
+    return None
+
+def _build_columns(metadatas: List[dict]) -> Dict[str, dict]:
+    types: Dict[str, set] = {}
+    for metadata in metadatas:
+        for key, value in metadata.items():
+            if value is not None:
+                types.setdefault(key, set()).add(type(value))
+
+    columns = {}
+    for key, value_types in types.items():
+        kind = _column_kind(value_types)
+        if kind is None:
+            # Mixed-type fields stay in the records and are filtered record by record
+            continue
+        values = [metadata.get(key) for metadata in metadatas]
+        if kind == 'bool':
+            present = np.fromiter((value is not None for value in values), dtype=bool, count=len(values))
+            bits = np.fromiter((bool(value) for value in values), dtype=bool, count=len(values))
+            columns[key] = {'kind': kind, 'bits': np.packbits(bits), 'present': np.packbits(present)}
+        elif kind == 'number':
+            columns[key] = {'kind': kind, 'values': np.fromiter((np.nan if value is None else float(value) for value in values), dtype=np.float64, count=len(values))}
+        else:
+            vocabulary = sorted({value for value in values if value is not None})
+            index = {value: code for code, value in enumerate(vocabulary)}
+            codes = np.fromiter((-1 if value is None else index[value] for value in values), dtype=np.int32, count=len(values))
+            columns[key] = {'kind': kind, 'codes': codes, 'vocabulary': vocabulary}
+    return columns
+
+def export_snapshot(manager: VectorStoreManager, path: str, ivf_lists: Optional[int] = None) -> dict:
+    try:
+        if not manager.vector_store:
+            raise ValueError("Vector store not initialized")
+
+        collection = manager.vector_store._collection
+        metric = manager.index_params['distance_metric']
+        logger.info(f"Exporting collection '{collection.name}' to snapshot {path}")
+
+        # First pass reads only ids and metadata; rows start out grouped by document
+        ids, metadatas = [], []
+        offset = 0
+        while True:
+            batch = collection.get(include=['metadatas'], limit=EXPORT_BATCH_SIZE, offset=offset)
+            if not batch['ids']:
+                break
+            ids.extend(batch['ids'])
+            metadatas.extend(metadata or {} for metadata in batch['metadatas'])
+            offset += len(batch['ids'])
+        if not ids:
+            raise ValueError("Collection is empty")
+
+        document_order = sorted(range(len(ids)), key=lambda i: (str(metadatas[i].get('doc_id', '')), metadatas[i].get('chunk_index', 0), i))
+        ids = [ids[i] for i in document_order]
+        metadatas = [metadatas[i] for i in document_order]
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+
+        with tempfile.TemporaryDirectory(dir=directory) as scratch:
+            # Second pass spills the vectors to a scratch file so the IVF lists can be trained on them
+            vectors = None
+            for start in range(0, len(ids), EXPORT_BATCH_SIZE):
+                batch_ids = ids[start:start + EXPORT_BATCH_SIZE]
+                batch = collection.get(ids=batch_ids, include=['embeddings'])
+                position = {doc_id: i for i, doc_id in enumerate(batch['ids'])}
+                block = np.asarray(batch['embeddings'], dtype=np.float32)[[position[doc_id] for doc_id in batch_ids]]
+                if vectors is None:
+                    vectors = np.lib.format.open_memmap(os.path.join(scratch, 'vectors.npy'), mode='w+', dtype=np.float32, shape=(len(ids), block.shape[1]))
+                vectors[start:start + len(block)] = block
+
+            lists = ivf_lists if ivf_lists is not None else (int(math.sqrt(len(ids))) if len(ids) >= IVF_MIN_ROWS else 0)
+            lists = min(lists, len(ids))
+            if lists > 0:
+                logger.info(f"Training IVF index with {lists} lists")
+                centroids = train_ivf(vectors, lists, metric)
+                assignments = np.empty(len(ids), dtype=np.int64)
+                for start in range(0, len(ids), EXPORT_BATCH_SIZE):
+                    block = np.asarray(vectors[start:start + EXPORT_BATCH_SIZE])
+                    assignments[start:start + len(block)] = _nearest_centroids(_normalize(block) if metric == 'cosine' else block, centroids)
+                order = np.argsort(assignments, kind='stable')
+                list_offsets = np.searchsorted(assignments[order], np.arange(lists + 1)).astype(np.int64)
+            else:
+                centroids = np.zeros((0, vectors.shape[1]), dtype=np.float32)
+                order = np.arange(len(ids))
+                list_offsets = np.zeros(1, dtype=np.int64)
+
+            ids = [ids[i] for i in order]
+            metadatas = [metadatas[i] for i in order]
+            norms = np.empty(len(ids), dtype=np.float32)
+            record_offsets = np.zeros(len(ids) + 1, dtype=np.uint64)
+
+            with open(tmp_path, 'wb') as f:
+                f.write(SNAPSHOT_MAGIC)
+                _pad(f)
+                embeddings_offset = f.tell()
+                for start in range(0, len(ids), EXPORT_BATCH_SIZE):
+                    rows = order[start:start + EXPORT_BATCH_SIZE]
+                    # Sorted gathers read the scratch file sequentially, then rows are put back in list order
+                    block = np.asarray(vectors[np.sort(rows)], dtype=np.float32)[np.argsort(np.argsort(rows))]
+                    f.write(block.tobytes())
+                    norms[start:start + len(block)] = (block ** 2).sum(axis=1)
+                norms_offset = _write_section(f, norms)
+
+                # Third pass streams the chunk text in final row order
+                _pad(f)
+                records_offset = f.tell()
+                for start in range(0, len(ids), EXPORT_BATCH_SIZE):
+                    batch_ids = ids[start:start + EXPORT_BATCH_SIZE]
+                    batch = collection.get(ids=batch_ids, include=['documents'])
+                    documents = dict(zip(batch['ids'], batch['documents']))
+                    for i, doc_id in enumerate(batch_ids):
+                        record = json.dumps({'id': doc_id, 'document': documents[doc_id], 'metadata': metadatas[start + i]}, ensure_ascii=False).encode('utf-8')
+                        f.write(record)
+                        record_offsets[start + i + 1] = record_offsets[start + i] + len(record)
+                record_offsets_offset = _write_section(f, record_offsets)
+
+                columns = {}
+                for key, column in _build_columns(metadatas).items():
+                    entry = {'kind': column['kind']}
+                    if column['kind'] == 'bool':
+                        entry['bits_offset'] = _write_section(f, column['bits'])
+                        entry['present_offset'] = _write_section(f, column['present'])
+                    elif column['kind'] == 'number':
+                        entry['values_offset'] = _write_section(f, column['values'])
+                    else:
+                        entry['codes_offset'] = _write_section(f, column['codes'])
+                        entry['vocabulary'] = column['vocabulary']
+                    columns[key] = entry
+
+                centroids_offset = _write_section(f, centroids)
+                list_offsets_offset = _write_section(f, list_offsets)
+
+                header = {
+                    'version': SNAPSHOT_VERSION,
+                    'collection_name': collection.name,
+                    'created_at': int(time.time()),
+                    'count': len(ids),
+                    'dimension': vectors.shape[1],
+                    'index_params': manager.index_params,
+                    'ivf_lists': lists,
+                    'embeddings_offset': embeddings_offset,
+                    'norms_offset': norms_offset,
+                    'records_offset': records_offset,
+                    'record_offsets_offset': record_offsets_offset,
+                    'centroids_offset': centroids_offset,
+                    'list_offsets_offset': list_offsets_offset,
+                    'columns': columns
+                }
+                encoded_header = json.dumps(header).encode('utf-8')
+                f.write(encoded_header)
+                f.write(struct.pack('<Q', len(encoded_header)))
+                f.write(SNAPSHOT_MAGIC)
+                f.flush()
+                os.fsync(f.fileno())
+            del vectors
+
+        os.replace(tmp_path, path)
+        logger.info(f"Snapshot exported: {len(ids)} chunk(s), {lists} IVF list(s), {os.path.getsize(path) / 1e6:.1f} MB")
+        return {key: header[key] for key in ('collection_name', 'count', 'dimension', 'index_params', 'ivf_lists')}
+
+    except Exception as e:
+        logger.error(f"Error exporting snapshot: {e}")
+        if 'tmp_path' in locals() and os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise e
+
+def _matches(metadata: dict, where: dict) -> bool:
+    for key, condition in where.items():
+        if key == '$and':
+            if not all(_matches(metadata, clause) for clause in condition):
+                return False
+            continue
+        if key == '$or':
+            if not any(_matches(metadata, clause) for clause in condition):
+                return False
+            continue
+
+        value = metadata.get(key)
+        if not isinstance(condition, dict):
+            condition = {'$eq': condition}
+        if value is None:
+            return False
+        for operator, operand in condition.items():
+            if operator == '$eq' and value != operand:
+                return False
+            if operator == '$ne' and value == operand:
+                return False
+            if operator == '$in' and value not in operand:
+                return False
+            if operator == '$nin' and value in operand:
+                return False
+            if operator == '$gt' and not value > operand:
+                return False
+            if operator == '$gte' and not value >= operand:
+                return False
+            if operator == '$lt' and not value < operand:
+                return False
+            if operator == '$lte' and not value <= operand:
+                return False
+    return True
+
+def _is_number(value) -> bool:
+    return isinstance(value, (bool, int, float))
+
+class SnapshotReplica:
+    build_filter = staticmethod(VectorStoreManager.build_filter)
+
+    def __init__(self, path: str, embedding_function: Optional[Embeddings] = None, warm: bool = False, nprobe: Optional[int] = None, exact_search_max_candidates: Optional[int] = None):
+        config = Config.get_vector_store_config()
+        self.path = path
+        self.embedding_function = embedding_function
+        self.nprobe = nprobe or config['snapshot_nprobe']
+        self.exact_search_max_candidates = exact_search_max_candidates or config['filter_exact_search_max_candidates']
+        self._file = None
+        self._mmap = None
+        self.header = None
+        self.embeddings = None
+        self.norms = None
+        self.record_offsets = None
+        self.centroids = None
+        self.list_offsets = None
+        self.columns: Dict[str, dict] = {}
+        self._open(warm)
+
+    def _view(self, dtype, count: int, offset: int) -> np.ndarray:
+        return np.frombuffer(self._mmap, dtype=dtype, count=count, offset=offset)
+
+    def _open(self, warm: bool):
+        try:
+            logger.info(f"Opening snapshot replica {self.path}")
+            self._file = open(self.path, 'rb')
+            # Read-only shared mapping: every replica process on the host reads the same page cache pages
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if self._mmap[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC or self._mmap[-len(SNAPSHOT_MAGIC):] != SNAPSHOT_MAGIC:
+                raise ValueError(f"{self.path} is not a version {SNAPSHOT_VERSION} vector store snapshot")
+
+            header_end = len(self._mmap) - len(SNAPSHOT_MAGIC) - 8
+            header_length = struct.unpack('<Q', self._mmap[header_end:header_end + 8])[0]
+            self.header = json.loads(self._mmap[header_end - header_length:header_end].decode('utf-8'))
+            if self.header['version'] != SNAPSHOT_VERSION:
+                raise ValueError(f"Unsupported snapshot version: {self.header['version']}")
+
+            count, dimension, lists = self.header['count'], self.header['dimension'], self.header['ivf_lists']
+            self.embeddings = self._view(np.float32, count * dimension, self.header['embeddings_offset']).reshape(count, dimension)
+            self.norms = self._view(np.float32, count, self.header['norms_offset'])
+            self.record_offsets = self._view(np.uint64, count + 1, self.header['record_offsets_offset'])
+            self.centroids = self._view(np.float32, lists * dimension, self.header['centroids_offset']).reshape(lists, dimension) if lists else None
+            self.list_offsets = self._view(np.int64, lists + 1, self.header['list_offsets_offset'])
+
+            packed = (count + 7) // 8
+            for key, entry in self.header['columns'].items():
+                if entry['kind'] == 'bool':
+                    column = {'bits': self._view(np.uint8, packed, entry['bits_offset']), 'present': self._view(np.uint8, packed, entry['present_offset'])}
+                elif entry['kind'] == 'number':
+                    column = {'values': self._view(np.float64, count, entry['values_offset'])}
+                else:
+                    column = {'codes': self._view(np.int32, count, entry['codes_offset']), 'index': {value: code for code, value in enumerate(entry['vocabulary'])}}
+                self.columns[key] = {'kind': entry['kind'], **column}
+
+            if warm:
+                self.warm()
+            logger.info(f"Snapshot replica opened: {count} chunk(s), dimension {dimension}, {lists} IVF list(s)")
+
+        except Exception as e:
+            logger.error(f"Error opening snapshot replica: {e}")
+            self.close()
+            raise e
+
+    def warm(self):
+        # Ask the kernel to start paging the vectors in ahead of the first queries
+        if hasattr(self._mmap, 'madvise') and hasattr(mmap, 'MADV_WILLNEED'):
+            self._mmap.madvise(mmap.MADV_WILLNEED)
+
+    @property
+    def index_params(self) -> dict:
+        return self.header['index_params']
+
+    def _record(self, row: int) -> dict:
+        start = self.header['records_offset'] + int(self.record_offsets[row])
+        end = self.header['records_offset'] + int(self.record_offsets[row + 1])
+        return json.loads(self._mmap[start:end].decode('utf-8'))
+
+    def _compare(self, field: str, operator: str, operand) -> np.ndarray:
+        column = self.columns[field]
+        count = self.header['count']
+        if column['kind'] == 'string':
+            codes = column['codes']
+            if operator in ('$eq', '$ne'):
+                equal = codes == column['index'].get(operand, -2)
+                return equal if operator == '$eq' else (codes >= 0) & ~equal
+            if operator in ('$in', '$nin'):
+                member = np.isin(codes, [column['index'][value] for value in operand if value in column['index']])
+                return member if operator == '$in' else (codes >= 0) & ~member
+            raise ValueError(f"Operator {operator} is not supported on string field '{field}'")
+
+        if column['kind'] == 'bool':
+            values = np.unpackbits(column['bits'], count=count).astype(np.float64)
+            values[~np.unpackbits(column['present'], count=count).astype(bool)] = np.nan
+        else:
+            values = column['values']
+
+        # Missing values are NaN, which fails every comparison, matching Chroma's handling of absent keys
+        with np.errstate(invalid='ignore'):
+            present = ~np.isnan(values)
+            if operator in ('$in', '$nin'):
+                member = np.isin(values, [float(value) for value in operand if _is_number(value)])
+                return member if operator == '$in' else present & ~member
+            if not _is_number(operand):
+                return present if operator == '$ne' else np.zeros(count, dtype=bool)
+            operand = float(operand)
+            if operator == '$eq':
+                return values == operand
+            if operator == '$ne':
+                return present & (values != operand)
+            if operator == '$gt':
+                return values > operand
+            if operator == '$gte':
+                return values >= operand
+            if operator == '$lt':
+                return values < operand
+            if operator == '$lte':
+                return values <= operand
+        raise ValueError(f"Unsupported filter operator: {operator}")
+
+    def _field_mask(self, field: str, condition) -> np.ndarray:
+        if not isinstance(condition, dict):
+            condition = {'$eq': condition}
+        count = self.header['count']
+        if field not in self.columns:
+            # Mixed-type or unknown fields have no column; fall back to decoding the records
+            logger.warning(f"Filter field '{field}' has no metadata column, checking records one by one")
+            return np.fromiter((_matches(self._record(row)['metadata'], {field: condition}) for row in range(count)), dtype=bool, count=count)
+
+        mask = np.ones(count, dtype=bool)
+        for operator, operand in condition.items():
+            mask &= self._compare(field, operator, operand)
+        return mask
+
+    def _where_mask(self, where: dict) -> np.ndarray:
+        mask = np.ones(self.header['count'], dtype=bool)
+        for key, condition in where.items():
+            if key == '$and':
+                for clause in condition:
+                    mask &= self._where_mask(clause)
+            elif key == '$or':
+                matched = np.zeros(self.header['count'], dtype=bool)
+                for clause in condition:
+                    matched |= self._where_mask(clause)
+                mask &= matched
+            else:
+                mask &= self._field_mask(key, condition)
+        return mask
+
+    def _distances(self, queries: np.ndarray, vectors: np.ndarray, norms: np.ndarray) -> np.ndarray:
+        metric = self.index_params['distance_metric']
+        dots = queries @ vectors.T
+        if metric == 'l2':
+            return (queries ** 2).sum(axis=1)[:, None] - 2 * dots + norms[None, :]
+        if metric == 'cosine':
+            return 1 - dots / np.maximum(np.sqrt(norms)[None, :] * np.linalg.norm(queries, axis=1)[:, None], 1e-12)
+        return 1 - dots
+
+    def _exact_rows(self, queries: np.ndarray, k: int, rows: np.ndarray) -> List[List[Tuple[int, float]]]:
+        if len(rows) == 0:
+            return [[] for _ in queries]
+        distances = self._distances(queries, self.embeddings[rows], self.norms[rows])
+        return [[(int(rows[i]), float(distances[q, i])) for i in top] for q, top in enumerate(top_k_indices(distances, k))]
+
+    def _scan(self, queries: np.ndarray, k: int, mask: Optional[np.ndarray]) -> List[List[Tuple[int, float]]]:
+        # Brute force block by block, keeping a running top-k per query and the distance matrix bounded
+        block_rows = max(1, SEARCH_BLOCK_ELEMENTS // len(queries))
+        best_rows = np.zeros((len(queries), 0), dtype=np.int64)
+        best_distances = np.zeros((len(queries), 0), dtype=np.float32)
+        for start in range(0, self.header['count'], block_rows):
+            end = min(start + block_rows, self.header['count'])
+            distances = self._distances(queries, self.embeddings[start:end], self.norms[start:end])
+            if mask is not None:
+                distances[:, ~mask[start:end]] = np.inf
+            candidates = top_k_indices(distances, k)
+            best_rows = np.concatenate([best_rows, candidates + start], axis=1)
+            best_distances = np.concatenate([best_distances, np.take_along_axis(distances, candidates, axis=1)], axis=1)
+            keep = top_k_indices(best_distances, k)
+            best_rows = np.take_along_axis(best_rows, keep, axis=1)
+            best_distances = np.take_along_axis(best_distances, keep, axis=1)
+
+        return [
+            [(int(row), float(distance)) for row, distance in zip(rows_q, distances_q) if np.isfinite(distance)]
+            for rows_q, distances_q in zip(best_rows, best_distances)
+        ]
+
+    def _probe(self, queries: np.ndarray, k: int, mask: Optional[np.ndarray]) -> List[List[Tuple[int, float]]]:
+        # Each query is searched exactly over the rows of its nprobe nearest IVF lists
+        centroid_norms = (self.centroids ** 2).sum(axis=1)
+        probes = top_k_indices(self._distances(queries, self.centroids, centroid_norms), self.nprobe)
+        results = []
+        for query, lists in zip(queries, probes):
+            rows = np.concatenate([np.arange(self.list_offsets[i], self.list_offsets[i + 1]) for i in lists])
+            if mask is not None:
+                rows = rows[mask[rows]]
+            if mask is not None and len(rows) < k:
+                # Too few matches near the query, search the whole filtered set instead
+                results.extend(self._scan(query[None, :], k, mask))
+            else:
+                results.extend(self._exact_rows(query[None, :], k, rows))
+        return results
+
+    def _top_k(self, queries: np.ndarray, k: int, where: Optional[dict]) -> List[List[Tuple[int, float]]]:
+        mask = self._where_mask(where) if where else None
+        if mask is not None:
+            rows = np.flatnonzero(mask)
+            if len(rows) == 0:
+                return [[] for _ in queries]
+            # Selective filters are cheapest to search exactly over their matches
+            if len(rows) <= self.exact_search_max_candidates:
+                return self._exact_rows(queries, k, rows)
+        if self.centroids is None:
+            return self._scan(queries, k, mask)
+        return self._probe(queries, k, mask)
+
+    def _document(self, row: int) -> Document:
+        record = self._record(row)
+        return Document(id=record['id'], page_content=record['document'] or "", metadata=record['metadata'])
+
+    def similarity_search_with_score(self, query: str, k: int = 5, filter: Optional[dict] = None) -> List[Tuple[Document, float]]:
+        try:
+            if not self.embedding_function:
+                raise ValueError("Embedding function must be provided")
+
+            logger.info(f"Performing snapshot similarity search for query: '{query[:50]}...'")
+            query_embedding = np.asarray([self.embedding_function.embed_query(query)], dtype=np.float32)
+            results = [(self._document(row), distance) for row, distance in self._top_k(query_embedding, k, filter)[0]]
+            logger.info(f"Found {len(results)} similar documents with scores")
+            return results
+
+        except Exception as e:
+            logger.error(f"Error performing snapshot similarity search: {e}")
+            return []
+
+    def similarity_search(self, query: str, k: int = 5, filter: Optional[dict] = None) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k=k, filter=filter)]
+
+    def similarity_search_by_vectors_with_score(self, query_embeddings: np.ndarray, k: int = 5, filter: Optional[dict] = None) -> List[List[Tuple[Document, float]]]:
+        try:
+            queries = np.asarray(query_embeddings, dtype=np.float32)
+            logger.info(f"Performing batched snapshot similarity search for {len(queries)} queries")
+            documents: Dict[int, Document] = {}
+            results = []
+            for matches in self._top_k(queries, k, filter):
+                for row, _ in matches:
+                    if row not in documents:
+                        documents[row] = self._document(row)
+                results.append([(documents[row], distance) for row, distance in matches])
+            return results
+
+        except Exception as e:
+            logger.error(f"Error performing batched snapshot similarity search: {e}")
+            raise e
+
+    def get_retriever(self, search_kwargs: Optional[dict] = None):
+        default_kwargs = {"k": 5}
+        if search_kwargs:
+            default_kwargs.update(search_kwargs)
+        return FilteredRetriever(manager=self, where=default_kwargs.get('filter') or {}, k=default_kwargs['k'])
+
+    def add_documents(self, documents: List[Document]) -> bool:
+        logger.error("Snapshot replicas are read-only; export a new snapshot to add documents")
+        return False
+
+    def clear_vector_store(self) -> bool:
+        logger.error("Snapshot replicas are read-only")
+        return False
+
+    def get_collection_stats(self) -> dict:
+        return {
+            'total_documents': self.header['count'] if self.header else 0,
+            'collection_name': self.header['collection_name'] if self.header else None,
+            'snapshot_path': self.path,
+            'index_params': self.index_params if self.header else None,
+            'ivf_lists': self.header['ivf_lists'] if self.header else None,
+            'nprobe': self.nprobe
+        }
+
+    def is_initialized(self) -> bool:
+        return self._mmap is not None
+
+    def close(self):
+        self.embeddings = self.norms = self.record_offsets = self.centroids = self.list_offsets = None
+        self.columns = {}
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,160 @@
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from langchain_core.documents import Document
+
+Span = Tuple[int, int]
+
+# Produces the same chunks as RecursiveCharacterTextSplitter(keep_separator=True, length_function=len),
+# but works on (start, end) offsets into the original text and only slices each chunk out once.
+# Separator positions are located once per document with numpy over the text's code points.
+class FastRecursiveTextSplitter:
+    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200, separators: Optional[List[str]] = None):
+        if chunk_size <= 0:
+            raise ValueError(f"chunk_size must be > 0, got {chunk_size}")
+        if chunk_overlap < 0:
+            raise ValueError(f"chunk_overlap must be >= 0, got {chunk_overlap}")
+        if chunk_overlap > chunk_size:
+            raise ValueError(f"Got a larger chunk overlap ({chunk_overlap}) than chunk size ({chunk_size}), should be smaller.")
+
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.separators = separators or ["\n\n", "\n", " ", ""]
+
+    @staticmethod
+    def _code_points(text: str) -> np.ndarray:
+        # Narrowest dtype that still gives one array element per character
+        if text.isascii():
+            return np.frombuffer(text.encode('ascii'), dtype=np.uint8)
+        if ord(max(text)) < 0xD800:
+            return np.frombuffer(text.encode('utf-16-le'), dtype=np.uint16)
+        return np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+
+    @staticmethod
+    def _find_all(code_points: np.ndarray, separator: str) -> np.ndarray:
+        # Every position where the separator starts, overlapping matches included
+        length = len(separator)
+        if len(code_points) < length:
+            return np.zeros(0, dtype=np.int64)
+
+        mask = code_points[:len(code_points) - length + 1] == ord(separator[0])
+        for offset in range(1, length):
+            mask &= code_points[offset:len(code_points) - length + 1 + offset] == ord(separator[offset])
+        return np.flatnonzero(mask)
+
+    @staticmethod
+    def _strip_span(text: str, start: int, end: int) -> Optional[Span]:
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        return (start, end) if start < end else None
+
+    def _separator_boundaries(self, positions: List[int], overlapping: bool, start: int, end: int, separator: str) -> List[int]:
+        if not separator:
+            return list(range(start, end + 1))
+
+        matches = positions[bisect_left(positions, start):bisect_right(positions, end - len(separator))]
+        if overlapping:
+            # re.split takes matches greedily left to right, so drop ones overlapping the previous match
+            kept = []
+            next_allowed = start
+            for position in matches:
+                if position >= next_allowed:
+                    kept.append(position)
+                    next_allowed = position + len(separator)
+            matches = kept
+
+        # The separator stays attached to the front of the piece that follows it, and a match
+        # at the very start of the span would only produce an empty piece
+        if matches and matches[0] == start:
+            matches = matches[1:]
+        return [start, *matches, end]
+
+    def _merge_run(self, text: str, boundaries: List[int], chunks: List[Span]):
+        # boundaries[i]:boundaries[i + 1] are contiguous pieces, each shorter than chunk_size,
+        # so the size of a window of pieces is the distance between two boundaries
+        last = len(boundaries) - 1
+        window_start = 0
+        while True:
+            overflow = bisect_right(boundaries, boundaries[window_start] + self.chunk_size, window_start + 1)
+            if overflow > last:
+                break
+
+            piece = overflow - 1
+            chunk = self._strip_span(text, boundaries[window_start], boundaries[piece])
+            if chunk is not None:
+                chunks.append(chunk)
+
+            # Drop pieces from the front until the window fits the overlap and leaves room for the next piece
+            keep_overlap = bisect_left(boundaries, boundaries[piece] - self.chunk_overlap, window_start, piece)
+            make_room = bisect_left(boundaries, boundaries[piece + 1] - self.chunk_size, window_start, piece)
+            window_start = max(keep_overlap, make_room)
+
+        chunk = self._strip_span(text, boundaries[window_start], boundaries[last])
+        if chunk is not None:
+            chunks.append(chunk)
+
+    def _positions(self, code_points: np.ndarray, cache: Dict[str, Tuple[List[int], bool]], separator: str) -> Tuple[List[int], bool]:
+        # Located lazily, most documents never need the finer separators
+        if separator not in cache:
+            found = self._find_all(code_points, separator)
+            overlapping = len(separator) > 1 and bool((np.diff(found) < len(separator)).any())
+            cache[separator] = (found.tolist(), overlapping)
+        return cache[separator]
+
+    def _split_span(self, text: str, code_points: np.ndarray, positions: Dict[str, Tuple[List[int], bool]], start: int, end: int, separators: List[str], chunks: List[Span]):
+        separator = separators[-1]
+        remaining_separators = []
+        for i, candidate in enumerate(separators):
+            if candidate == "":
+                separator = candidate
+                break
+            found = self._positions(code_points, positions, candidate)[0]
+            first = bisect_left(found, start)
+            if first < len(found) and found[first] + len(candidate) <= end:
+                separator = candidate
+                remaining_separators = separators[i + 1:]
+                break
+
+        found, overlapping = self._positions(code_points, positions, separator) if separator else ([], False)
+        boundaries = self._separator_boundaries(found, overlapping, start, end, separator)
+
+        run_start = 0
+        for piece in range(len(boundaries) - 1):
+            piece_start, piece_end = boundaries[piece], boundaries[piece + 1]
+            if piece_end - piece_start < self.chunk_size:
+                continue
+
+            if piece > run_start:
+                self._merge_run(text, boundaries[run_start:piece + 1], chunks)
+            if not remaining_separators:
+                chunks.append((piece_start, piece_end))
+            else:
+                self._split_span(text, code_points, positions, piece_start, piece_end, remaining_separators, chunks)
+            run_start = piece + 1
+
+        if run_start < len(boundaries) - 1:
+            self._merge_run(text, boundaries[run_start:], chunks)
+
+    def split_text_offsets(self, text: str) -> List[Span]:
+        # Everything shorter than a chunk merges into a single chunk, whatever the separators
+        if len(text) < self.chunk_size:
+            chunk = self._strip_span(text, 0, len(text))
+            return [chunk] if chunk is not None else []
+
+        chunks = []
+        self._split_span(text, self._code_points(text), {}, 0, len(text), self.separators, chunks)
+        return chunks
+
+    def split_text(self, text: str) -> List[str]:
+        return [text[start:end] for start, end in self.split_text_offsets(text)]
+
+    def split_documents(self, documents: List[Document]) -> List[Document]:
+        chunks = []
+        for document in documents:
+            text = document.page_content
+            for start, end in self.split_text_offsets(text):
+                metadata = {**document.metadata, 'start_index': start, 'end_index': end}
+                chunks.append(Document(page_content=text[start:end], metadata=metadata))
+        return chunks
@@ -29,7 +29,7 @@ def render_getting_started():
     st.markdown("""
     <div class="info-box">
         <h4>Getting Started</h4>
-        <p>1. Upload a text document (.txt) using the file uploader above</p>
+        <p>1. Upload a document (.txt, .md, .html, .csv or .pdf) using the file uploader above</p>
         <p>2. Wait for the document to be processed</p>
         <p>3. Start asking questions about your document!</p>
     </div>
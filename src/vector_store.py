@@ -1,16 +1,60 @@
 import logging
 import os
-from typing import List, Optional, Tuple
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
 from langchain_chroma import Chroma
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
 from langchain_core.documents import Document
 from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+
+from .config import Config
+from .document_processor import DocumentProcessor
+from .embedding_pool import EmbeddingWorkerPool
 
 logger = logging.getLogger(__name__)
 
+def exact_distances(corpus: np.ndarray, queries: np.ndarray, metric: str) -> np.ndarray:
+    # Same distance definitions Chroma's HNSW index reports
+    if metric == 'l2':
+        return (queries ** 2).sum(axis=1)[:, None] - 2 * queries @ corpus.T + (corpus ** 2).sum(axis=1)[None, :]
+    if metric == 'cosine':
+        corpus_norm = corpus / np.linalg.norm(corpus, axis=1, keepdims=True)
+        query_norm = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+        return 1 - query_norm @ corpus_norm.T
+    return 1 - queries @ corpus.T
+
+def top_k_indices(distances: np.ndarray, k: int) -> np.ndarray:
+    # Row-wise indices of the k smallest distances, nearest first
+    k = min(k, distances.shape[1])
+    top = np.argpartition(distances, k - 1, axis=1)[:, :k]
+    order = np.take_along_axis(distances, top, axis=1).argsort(axis=1)
+    return np.take_along_axis(top, order, axis=1)
+
+class FilteredRetriever(BaseRetriever):
+    manager: Any
+    where: Dict[str, Any]
+    k: int = 5
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        return self.manager.similarity_search(query, k=self.k, filter=self.where)
+
 class VectorStoreManager:
-    def __init__(self, persist_directory: str = "./chroma_db", embedding_function: Optional[Embeddings] = None):
+    # Stays under Chroma's maximum insert batch size
+    UPSERT_BATCH_SIZE = 5000
+
+    def __init__(self, persist_directory: str = "./chroma_db", embedding_function: Optional[Embeddings] = None, embedding_pool: Optional[EmbeddingWorkerPool] = None, collection_name: Optional[str] = None, index_params: Optional[dict] = None):
+        config = Config.get_vector_store_config()
         self.persist_directory = persist_directory
         self.embedding_function = embedding_function
+        self.embedding_pool = embedding_pool
+        self.collection_name = collection_name or config['collection_name']
+        # Configured parameters are kept apart from the ones the collection actually runs with,
+        # so rebuild_index can apply them to a collection created with other settings
+        self.configured_index_params = {**config['index_params'], **(index_params or {})}
+        self.index_params = dict(self.configured_index_params)
+        self.filter_exact_search_max_candidates = config['filter_exact_search_max_candidates']
         self.vector_store = None
         self._ensure_persist_directory()
 
@@ -21,7 +65,33 @@ class VectorStoreManager:
         except Exception as e:
             logger.error(f"Error creating persist directory: {e}")
             raise e
-        
+
+    @staticmethod
+    def build_collection_metadata(index_params: dict) -> dict:
+        metric = index_params['distance_metric']
+        if metric not in Config.SUPPORTED_DISTANCE_METRICS:
+            raise ValueError(f"Unsupported distance metric: {metric}")
+
+        # Parameters left unset are not written, so Chroma applies its own defaults
+        metadata = {'hnsw:space': metric}
+        for key, name in (('m', 'hnsw:M'), ('ef_construction', 'hnsw:construction_ef'), ('ef_search', 'hnsw:search_ef')):
+            if index_params.get(key) is not None:
+                metadata[name] = int(index_params[key])
+        return metadata
+
+    @staticmethod
+    def read_index_params(collection) -> dict:
+        # configuration_json holds the values the index runs with, Chroma's defaults included;
+        # collection metadata only records what was passed at creation
+        hnsw = (getattr(collection, 'configuration_json', None) or {}).get('hnsw') or {}
+        metadata = collection.metadata or {}
+        return {
+            'distance_metric': hnsw.get('space', metadata.get('hnsw:space', 'l2')),
+            'm': hnsw.get('max_neighbors', metadata.get('hnsw:M')),
+            'ef_construction': hnsw.get('ef_construction', metadata.get('hnsw:construction_ef')),
+            'ef_search': hnsw.get('ef_search', metadata.get('hnsw:search_ef'))
+        }
+
     def initialize_vector_store(self, embedding_function: Optional[Embeddings] = None):
         if embedding_function:
             self.embedding_function = embedding_function
@@ -32,9 +102,17 @@ class VectorStoreManager:
         try:
             logger.info("Initializing vector store")
             self.vector_store = Chroma(
+                collection_name=self.collection_name,
                 persist_directory=self.persist_directory,
-                embedding_function=self.embedding_function
+                embedding_function=self.embedding_function,
+                collection_metadata=self.build_collection_metadata(self.index_params)
             )
+            # Index parameters are fixed when a collection is created; an existing
+            # collection keeps its own until rebuild_index is run
+            self.index_params = self.read_index_params(self.vector_store._collection)
+            mismatched = {key: value for key, value in self.configured_index_params.items() if value is not None and self.index_params.get(key) != value}
+            if mismatched:
+                logger.warning(f"Collection '{self.collection_name}' was built with {self.index_params}, not the configured {mismatched}; run rebuild_index to apply them")
             logger.info("Vector store initialized successfully")
             
         except Exception as e:
@@ -47,7 +125,10 @@ class VectorStoreManager:
                 raise ValueError("Vector store not initialized")
             
             logger.info(f"Adding {len(documents)} document(s) to vector store")
-            self.vector_store.add_documents(documents)
+            if self.embedding_pool and self.embedding_pool.should_use_pool(len(documents)):
+                self._add_documents_with_pool(documents)
+            else:
+                self.vector_store.add_documents(documents)
             logger.info("Documents added successfully")
             return True
             
@@ -55,13 +136,141 @@ class VectorStoreManager:
             logger.error(f"Error adding documents to vector store: {e}")
             return False
         
-    def similarity_search(self, query: str, k: int = 5) -> List[Document]:
+    def _upsert_records(self, collection, ids: List[str], embeddings: np.ndarray, documents: List[str], metadatas: List[Optional[dict]]):
+        # Chroma takes the float32 rows directly, without a round trip through Python lists
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        # Chroma rejects empty metadata dicts, so those rows go in without metadata
+        with_metadata = [i for i, metadata in enumerate(metadatas) if metadata]
+        without_metadata = [i for i, metadata in enumerate(metadatas) if not metadata]
+
+        if with_metadata:
+            collection.upsert(
+                ids=[ids[i] for i in with_metadata],
+                embeddings=embeddings[with_metadata],
+                documents=[documents[i] for i in with_metadata],
+                metadatas=[metadatas[i] for i in with_metadata]
+            )
+        if without_metadata:
+            collection.upsert(
+                ids=[ids[i] for i in without_metadata],
+                embeddings=embeddings[without_metadata],
+                documents=[documents[i] for i in without_metadata]
+            )
+
+    def _add_documents_with_pool(self, documents: List[Document]):
+        texts = [doc.page_content for doc in documents]
+        embeddings = self.embedding_pool.embed_array(texts)
+        collection = self.vector_store._collection
+
+        for start in range(0, len(documents), self.UPSERT_BATCH_SIZE):
+            batch = documents[start:start + self.UPSERT_BATCH_SIZE]
+            self._upsert_records(
+                collection,
+                ids=[getattr(doc, 'id', None) or str(uuid.uuid4()) for doc in batch],
+                embeddings=embeddings[start:start + self.UPSERT_BATCH_SIZE],
+                documents=texts[start:start + self.UPSERT_BATCH_SIZE],
+                metadatas=[doc.metadata for doc in batch]
+            )
+
+    def rebuild_index(self, index_params: Optional[dict] = None) -> bool:
+        try:
+            if not self.vector_store:
+                raise ValueError("Vector store not initialized")
+
+            # The collection's current settings, overridden by the configured ones and then by the arguments
+            configured = {key: value for key, value in self.configured_index_params.items() if value is not None}
+            params = {**self.index_params, **configured, **(index_params or {})}
+            client = self.vector_store._client
+            source = self.vector_store._collection
+            rebuild_name = f"{self.collection_name}_rebuild_{uuid.uuid4().hex[:8]}"
+            logger.info(f"Rebuilding index for '{self.collection_name}' with {params}")
+
+            target = client.create_collection(name=rebuild_name, metadata=self.build_collection_metadata(params))
+            offset = 0
+            while True:
+                batch = source.get(include=['embeddings', 'documents', 'metadatas'], limit=self.UPSERT_BATCH_SIZE, offset=offset)
+                if not batch['ids']:
+                    break
+                self._upsert_records(target, batch['ids'], batch['embeddings'], batch['documents'], batch['metadatas'])
+                offset += len(batch['ids'])
+
+            if target.count() != source.count():
+                client.delete_collection(rebuild_name)
+                raise RuntimeError(f"Rebuilt collection has {target.count()} records, expected {source.count()}")
+
+            # Swap by renaming so the collection name always points at a complete copy of the data
+            backup_name = f"{self.collection_name}_backup_{uuid.uuid4().hex[:8]}"
+            source.modify(name=backup_name)
+            try:
+                target.modify(name=self.collection_name)
+            except Exception:
+                source.modify(name=self.collection_name)
+                raise
+            client.delete_collection(backup_name)
+            self.configured_index_params = {**self.configured_index_params, **(index_params or {})}
+            self.initialize_vector_store()
+            logger.info(f"Index rebuilt: {offset} record(s) re-indexed")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error rebuilding index: {e}")
+            return False
+        
+    @staticmethod
+    def build_filter(doc_ids: Optional[List[str]] = None, filenames: Optional[List[str]] = None, tags: Optional[List[str]] = None, ingested_after: Optional[float] = None, ingested_before: Optional[float] = None) -> Optional[dict]:
+        conditions = []
+        if doc_ids:
+            conditions.append({'doc_id': {'$in': list(doc_ids)}})
+        if filenames:
+            conditions.append({'filename': {'$in': list(filenames)}})
+        for tag in tags or []:
+            conditions.append({DocumentProcessor.tag_key(tag): {'$eq': True}})
+        if ingested_after is not None:
+            conditions.append({'ingested_at': {'$gte': int(ingested_after)}})
+        if ingested_before is not None:
+            conditions.append({'ingested_at': {'$lt': int(ingested_before)}})
+
+        if not conditions:
+            return None
+        return conditions[0] if len(conditions) == 1 else {'$and': conditions}
+
+    def _filter_candidates(self, where: dict) -> List[str]:
+        # Resolved against Chroma's metadata index on every query, no vectors are read. Other managers
+        # on the same persisted collection may have written since, so the ids are not cached, and only
+        # one id past the exact-search threshold is fetched to tell a selective filter from a broad one.
+        return self.vector_store._collection.get(where=where, include=[], limit=self.filter_exact_search_max_candidates + 1)['ids']
+
+    def _filtered_search_with_score(self, query: str, k: int, where: dict) -> List[Tuple[Document, float]]:
+        candidate_ids = self._filter_candidates(where)
+        if not candidate_ids:
+            return []
+
+        # Large candidate sets stay on the HNSW index; small ones are searched exactly,
+        # since a selective filter makes the graph walk degrade towards a full scan
+        if len(candidate_ids) > self.filter_exact_search_max_candidates:
+            logger.info(f"Filter matched more than {self.filter_exact_search_max_candidates} chunks, using filtered index search")
+            return self.vector_store.similarity_search_with_score(query, k=k, filter=where)
+
+        logger.info(f"Filter matched {len(candidate_ids)} chunks, using exact search over candidates")
+        records = self.vector_store._collection.get(ids=candidate_ids, include=['embeddings', 'documents', 'metadatas'])
+        query_embedding = np.asarray([self.embedding_function.embed_query(query)], dtype=np.float32)
+        distances = exact_distances(np.asarray(records['embeddings'], dtype=np.float32), query_embedding, self.index_params['distance_metric'])[0]
+
+        return [
+            (Document(id=records['ids'][i], page_content=records['documents'][i], metadata=records['metadatas'][i] or {}), float(distances[i]))
+            for i in np.argsort(distances)[:k]
+        ]
+
+    def similarity_search(self, query: str, k: int = 5, filter: Optional[dict] = None) -> List[Document]:
         try:
             if not self.vector_store:
                 raise ValueError("Vector store not initialized")
             
             logger.info(f"Performing similarity search for query: '{query[:50]}...'")
-            results = self.vector_store.similarity_search(query, k=k)
+            if filter:
+                results = [doc for doc, _ in self._filtered_search_with_score(query, k, filter)]
+            else:
+                results = self.vector_store.similarity_search(query, k=k)
             logger.info(f"Found {len(results)} similar documents")
             return results
             
@@ -69,13 +278,16 @@ class VectorStoreManager:
             logger.error(f"Error performing similarity search: {e}")
             return []
         
-    def similarity_search_with_score(self, query: str, k: int = 5) -> List[Tuple[Document, float]]:
+    def similarity_search_with_score(self, query: str, k: int = 5, filter: Optional[dict] = None) -> List[Tuple[Document, float]]:
         try:
             if not self.vector_store:
                 raise ValueError("Vector store not initialized")
             
             logger.info(f"Performing similarity search with scores for query: '{query[:50]}...'")
-            results = self.vector_store.similarity_search_with_score(query, k=k)
+            if filter:
+                results = self._filtered_search_with_score(query, k, filter)
+            else:
+                results = self.vector_store.similarity_search_with_score(query, k=k)
             logger.info(f"Found {len(results)} similar documents with scores")
             return results
             
@@ -83,6 +295,45 @@ class VectorStoreManager:
             logger.error(f"Error performing similarity search with scores: {e}")
             return []
         
+    def similarity_search_by_vectors_with_score(self, query_embeddings: np.ndarray, k: int = 5, filter: Optional[dict] = None) -> List[List[Tuple[Document, float]]]:
+        try:
+            if not self.vector_store:
+                raise ValueError("Vector store not initialized")
+
+            queries = np.asarray(query_embeddings, dtype=np.float32)
+            logger.info(f"Performing batched similarity search for {len(queries)} queries")
+            # One Document per chunk, shared by every query that retrieves it
+            documents: Dict[str, Document] = {}
+
+            if filter:
+                candidate_ids = self._filter_candidates(filter)
+                if not candidate_ids:
+                    return [[] for _ in queries]
+                if len(candidate_ids) <= self.filter_exact_search_max_candidates:
+                    records = self.vector_store._collection.get(ids=candidate_ids, include=['embeddings', 'documents', 'metadatas'])
+                    distances = exact_distances(np.asarray(records['embeddings'], dtype=np.float32), queries, self.index_params['distance_metric'])
+                    results = []
+                    for row, top in enumerate(top_k_indices(distances, k)):
+                        for i in top:
+                            if records['ids'][i] not in documents:
+                                documents[records['ids'][i]] = Document(id=records['ids'][i], page_content=records['documents'][i], metadata=records['metadatas'][i] or {})
+                        results.append([(documents[records['ids'][i]], float(distances[row, i])) for i in top])
+                    return results
+
+            # Chroma searches the whole query matrix in one call
+            response = self.vector_store._collection.query(query_embeddings=queries.tolist(), n_results=k, where=filter or None, include=['documents', 'metadatas', 'distances'])
+            results = []
+            for ids, texts, metadatas, distances in zip(response['ids'], response['documents'], response['metadatas'], response['distances']):
+                for doc_id, text, metadata in zip(ids, texts, metadatas):
+                    if doc_id not in documents:
+                        documents[doc_id] = Document(id=doc_id, page_content=text, metadata=metadata or {})
+                results.append([(documents[doc_id], float(distance)) for doc_id, distance in zip(ids, distances)])
+            return results
+
+        except Exception as e:
+            logger.error(f"Error performing batched similarity search: {e}")
+            raise e
+
     def get_retriever(self, search_kwargs: Optional[dict] = None):
         try:
             if not self.vector_store:
@@ -92,7 +343,10 @@ class VectorStoreManager:
             if search_kwargs:
                 default_kwargs.update(search_kwargs)
             
-            retriever = self.vector_store.as_retriever(search_kwargs=default_kwargs)
+            if default_kwargs.get('filter'):
+                retriever = FilteredRetriever(manager=self, where=default_kwargs['filter'], k=default_kwargs['k'])
+            else:
+                retriever = self.vector_store.as_retriever(search_kwargs=default_kwargs)
             logger.info("Retriever created successfully")
             return retriever
             
@@ -111,7 +365,8 @@ class VectorStoreManager:
             return {
                 'total_documents': count,
                 'collection_name': collection.name,
-                'persist_directory': self.persist_directory
+                'persist_directory': self.persist_directory,
+                'index_params': self.index_params
             }
         
         except Exception as e:
@@ -0,0 +1,17 @@
+import pytest
+
+from tests.stub_llm_server import StubChatModel, StubServer
+
+@pytest.fixture
+def stub_server():
+    # Starts local stand-ins for the LLM provider and stops them after the test
+    servers = []
+
+    def start(latency: float = 0.02, rate: float = 1000.0, burst: int = 1000, error_rate: float = 0.0):
+        server = StubServer(latency, rate, burst, error_rate)
+        servers.append(server)
+        return server, StubChatModel(url=server.start())
+
+    yield start
+    for server in servers:
+        server.stop()
@@ -0,0 +1,102 @@
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, List, Optional
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from src.llm_client import TokenBucket
+
+class StubServer(ThreadingHTTPServer):
+    # Local stand-in for the provider: fixed latency, its own rate limit and 429s above it
+    daemon_threads = True
+
+    def __init__(self, latency: float, rate: float, burst: int, error_rate: float):
+        super().__init__(('127.0.0.1', 0), StubHandler)
+        self.latency = latency
+        self.quota = TokenBucket(rate, burst)
+        self.error_rate = error_rate
+        self.rng = random.Random(0)
+        self.lock = threading.Lock()
+        self.counts = {'requests': 0, 'throttled': 0, 'errors': 0}
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def count(self, name: str):
+        with self.lock:
+            self.counts[name] += 1
+
+    def enter(self):
+        with self.lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def leave(self):
+        with self.lock:
+            self.in_flight -= 1
+
+    def should_fail(self) -> bool:
+        with self.lock:
+            return self.rng.random() < self.error_rate
+
+    def start(self) -> str:
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return f"http://127.0.0.1:{self.server_address[1]}/generate"
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.server.count('requests')
+        self.server.enter()
+        try:
+            if not self.server.quota.acquire(deadline=time.monotonic()):
+                self.server.count('throttled')
+                return self.respond(429, {'error': 'rate limited'})
+            time.sleep(self.server.latency)
+            if self.server.should_fail():
+                self.server.count('errors')
+                return self.respond(503, {'error': 'unavailable'})
+            self.respond(200, {'text': f"answer to: {body['prompt'][:40]}"})
+        finally:
+            self.server.leave()
+
+    def respond(self, status: int, payload: dict):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+class StubServerError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"stub server returned {status_code}")
+        self.status_code = status_code
+
+class StubChatModel(BaseChatModel):
+    url: str
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub"
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        request = urllib.request.Request(self.url, data=json.dumps({'prompt': messages[-1].content}).encode('utf-8'), headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                text = json.loads(response.read())['text']
+        except urllib.error.HTTPError as e:
+            raise StubServerError(e.code)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
@@ -0,0 +1,108 @@
+import json
+import os
+import sys
+from typing import Any, List, Optional
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+pytest.importorskip("langchain_google_genai")
+pytest.importorskip("google.generativeai")
+pytest.importorskip("langchain_huggingface")
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+
+from src import batch_query
+from src.embedding_manager import EmbeddingManager
+from src.rag_pipeline import RAGPipeline
+from src.vector_store import VectorStoreManager
+from tests.test_vector_store import HashEmbeddings, make_chunks
+
+class QueryPrefixedEmbeddings(HashEmbeddings):
+    # Queries are encoded differently from documents, like models with query instructions
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [super(QueryPrefixedEmbeddings, self).embed_query(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return super().embed_query("query: " + text)
+
+class EchoChatModel(BaseChatModel):
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "echo"
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        self.calls += 1
+        question = messages[-1].content.rsplit("Question:", 1)[-1].split("\n")[0].strip()
+        if "explode" in question:
+            raise RuntimeError("model failure")
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=f"answer to {question}"))])
+
+@pytest.fixture
+def pipeline(tmp_path):
+    embeddings = QueryPrefixedEmbeddings()
+    manager = VectorStoreManager(persist_directory=str(tmp_path / "chroma"), embedding_function=embeddings)
+    manager.initialize_vector_store()
+    manager.add_documents(make_chunks("a.txt", 20) + make_chunks("b.txt", 20))
+
+    # Components are wired directly so no model is downloaded and no API is called
+    embedding_manager = EmbeddingManager.__new__(EmbeddingManager)
+    embedding_manager.model_name = "hash"
+    embedding_manager.embeddings = embeddings
+    embedding_manager.query_batcher = None
+    pipeline = RAGPipeline.__new__(RAGPipeline)
+    pipeline.embedding_manager = embedding_manager
+    pipeline.vector_store_manager = manager
+    pipeline.llm = EchoChatModel()
+    pipeline._initialize_qa_chain()
+    return pipeline
+
+def test_batch_retrieval_matches_single_queries(pipeline):
+    questions = ["a.txt chunk 3", "b.txt chunk 7"]
+    results = sorted(pipeline.query_batch(questions), key=lambda result: result['index'])
+    for question, result in zip(questions, results):
+        expected = pipeline.vector_store_manager.similarity_search_with_score(question, k=5)
+        assert [source['id'] for source in result['sources']] == [doc.id for doc, _ in expected]
+        assert result['answer'] == f"answer to {question}"
+        assert result['error'] is None
+
+def test_duplicate_questions_fan_out_to_every_index(pipeline):
+    results = list(pipeline.query_batch(["a.txt chunk 1", "b.txt chunk 2", "a.txt chunk 1"]))
+    assert sorted(result['index'] for result in results) == [0, 1, 2]
+    duplicates = [result for result in results if result['question'] == "a.txt chunk 1"]
+    assert [result['answer'] for result in duplicates] == ["answer to a.txt chunk 1"] * 2
+    assert pipeline.llm.calls == 2
+
+def test_questions_without_matching_chunks_report_an_error(pipeline):
+    results = list(pipeline.query_batch(["a.txt chunk 1"], filter=VectorStoreManager.build_filter(doc_ids=["missing.txt"])))
+    assert results[0]['error'] == "No matching chunks were retrieved"
+    assert results[0]['answer'] == ""
+    assert results[0]['sources'] == []
+    assert pipeline.llm.calls == 0
+
+def run_cli(monkeypatch, pipeline, tmp_path, questions: List[str]):
+    questions_path = tmp_path / "questions.txt"
+    questions_path.write_text("\n".join(questions) + "\n", encoding='utf-8')
+    output_path = tmp_path / "results.jsonl"
+    monkeypatch.setattr(batch_query, "RAGPipeline", lambda **kwargs: pipeline)
+    monkeypatch.setattr(sys, "argv", ["batch_query", str(questions_path), "--output", str(output_path)])
+
+    with pytest.raises(SystemExit) as exit_info:
+        batch_query.main()
+    with open(output_path, encoding='utf-8') as f:
+        return exit_info.value.code, [json.loads(line) for line in f]
+
+def test_cli_writes_one_line_per_question(monkeypatch, pipeline, tmp_path):
+    questions = ["a.txt chunk 1", "b.txt chunk 2", "a.txt chunk 1"]
+    code, records = run_cli(monkeypatch, pipeline, tmp_path, questions)
+    assert code == 0
+    assert sorted(record['index'] for record in records) == [0, 1, 2]
+    assert all(record['question'] == questions[record['index']] for record in records)
+
+def test_cli_exits_nonzero_when_a_question_fails(monkeypatch, pipeline, tmp_path):
+    code, records = run_cli(monkeypatch, pipeline, tmp_path, ["a.txt chunk 1", "explode a.txt chunk 2"])
+    assert code == 1
+    assert len(records) == 2
+    assert [record['error'] is not None for record in sorted(records, key=lambda record: record['index'])] == [False, True]
@@ -0,0 +1,49 @@
+import pytest
+from langchain_core.documents import Document
+
+from src.conversation import ConversationMemory
+
+REVENUE_QUESTION = "What were the quarterly revenue figures for the European division?"
+
+@pytest.fixture
+def memory():
+    memory = ConversationMemory(max_turns=2, summary_max_chars=300)
+    memory.add_turn(REVENUE_QUESTION, "Revenue grew 4%. More detail follows.", REVENUE_QUESTION, [Document(page_content="revenue table")])
+    return memory
+
+def test_first_question_is_standalone():
+    assert ConversationMemory().condense(REVENUE_QUESTION) == (REVENUE_QUESTION, False)
+
+@pytest.mark.parametrize("question", ["Who is the CEO?", "What is photosynthesis?", "Penalties?", "How are invoices issued?"])
+def test_new_topic_is_not_condensed(memory, question):
+    assert memory.condense(question) == (question, False)
+    assert not memory.can_reuse_documents(question)
+
+@pytest.mark.parametrize("question", ["What about section 3?", "And for the Asian division?", "How did it change last year?"])
+def test_follow_up_borrows_topic_terms(memory, question):
+    standalone, is_follow_up = memory.condense(question)
+    assert is_follow_up
+    assert standalone.startswith(question)
+    assert "revenue" in standalone
+
+def test_elaboration_reuses_previous_documents(memory):
+    question = "Can you explain that in more detail?"
+    assert memory.condense(question)[1]
+    assert memory.can_reuse_documents(question)
+    assert not memory.can_reuse_documents(question, filter={'filename': {'$in': ['other.pdf']}})
+
+def test_follow_up_with_new_terms_retrieves_again(memory):
+    assert not memory.can_reuse_documents("What about section 3?")
+
+def test_old_turns_are_folded_into_bounded_summary(memory):
+    for i in range(5):
+        memory.add_turn(f"question {i}", f"Answer {i}. Extra sentence.", f"question {i}", [])
+    assert len(memory.turns) == 2
+    assert len(memory.summary) <= 300
+    assert "Answer 2." in memory.summary
+    assert "Extra sentence" not in memory.summary
+
+def test_clear_resets_memory(memory):
+    memory.clear()
+    assert not memory.turns and not memory.summary and not memory.last_documents
+    assert memory.condense("What about it?") == ("What about it?", False)
@@ -0,0 +1,34 @@
+import csv
+
+from src.document_processor import DocumentProcessor
+
+def write_csv(path, rows: int):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['id', 'name', 'amount'])
+        for i in range(rows):
+            writer.writerow([i, f"customer {i}", i * 10])
+
+def test_small_csv_rows_are_packed_into_chunk_sized_groups(tmp_path):
+    path = tmp_path / "table.csv"
+    write_csv(path, 1000)
+    chunks = DocumentProcessor(chunk_size=1000, chunk_overlap=100).process_document(str(path))
+
+    assert len(chunks) < 100
+    assert all(len(chunk.page_content) <= 1000 for chunk in chunks)
+    # Every row survives exactly once, in order
+    text = "\n\n".join(chunk.page_content for chunk in chunks)
+    assert text.count("name: customer") == 1000
+    assert chunks[0].metadata['row'] == 0
+    assert chunks[1].metadata['row'] == chunks[0].metadata['row_end'] + 1
+    assert chunks[-1].metadata['row_end'] == 999
+
+def test_large_records_are_still_split(tmp_path):
+    path = tmp_path / "notes.md"
+    path.write_text("# Short\n\nA short section.\n\n# Long\n\n" + "word " * 1000, encoding='utf-8')
+    chunks = DocumentProcessor(chunk_size=500, chunk_overlap=50).process_document(str(path))
+
+    assert chunks[0].metadata['section'] == "Short"
+    assert all(chunk.metadata['section'] == "Long" for chunk in chunks[1:])
+    assert len(chunks) > 5
+    assert all(len(chunk.page_content) <= 500 for chunk in chunks)
@@ -0,0 +1,55 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+from langchain_core.embeddings import Embeddings
+
+from src.embedding_batcher import embed_queries, get_shared_batcher
+
+class CountingEmbeddings(Embeddings):
+    # Shaped like HuggingFaceEmbeddings: both paths go through _embed, queries with their own kwargs
+    def __init__(self):
+        self.calls = 0
+        self.encode_kwargs = {}
+        self.query_encode_kwargs = {'prompt': "query: "}
+
+    def _embed(self, texts: List[str], encode_kwargs: dict) -> List[List[float]]:
+        self.calls += 1
+        return [[float(len(encode_kwargs.get('prompt', "") + text))] for text in texts]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._embed(texts, self.encode_kwargs)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed([text], self.query_encode_kwargs)[0]
+
+def test_sessions_share_one_batcher_per_model():
+    model = CountingEmbeddings()
+    first = get_shared_batcher("test-shared-model", lambda: model, max_wait_ms=50, max_batch_size=64)
+    second = get_shared_batcher("test-shared-model", CountingEmbeddings, max_wait_ms=50, max_batch_size=64)
+    assert first is second
+    assert get_shared_batcher("test-other-model", CountingEmbeddings) is not first
+
+def test_queries_from_different_sessions_are_batched_together():
+    model = CountingEmbeddings()
+    sessions = [get_shared_batcher("test-batched-model", lambda: model, max_wait_ms=100, max_batch_size=64) for _ in range(16)]
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        vectors = list(executor.map(lambda pair: pair[0].embed_query("x" * pair[1]), zip(sessions, range(16))))
+
+    assert model.calls < 16
+    # Batched queries still use the query path
+    assert vectors == [model.embed_query("x" * i) for i in range(16)]
+    assert sessions[0].get_stats()['total_requests'] == 16
+
+class PrefixedQueryEmbeddings(Embeddings):
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [[float(len(text))] for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return [float(len("query: " + text))]
+
+def test_embed_queries_uses_the_query_path():
+    assert embed_queries(PrefixedQueryEmbeddings(), ["a", "bc"]) == [[8.0], [9.0]]
+
+    model = CountingEmbeddings()
+    assert embed_queries(model, ["a", "bc"]) == [model.embed_query("a"), model.embed_query("bc")]
+    assert model.calls == 3
@@ -0,0 +1,56 @@
+import numpy as np
+
+from src import embedding_pool
+from src.embedding_pool import EmbeddingWorkerPool, close_shared_pools, get_shared_pool
+from src.vector_store import VectorStoreManager
+from tests.test_vector_store import HashEmbeddings, make_chunks
+
+def hash_embeddings(model_name: str) -> HashEmbeddings:
+    # Module-level so spawned workers can unpickle it
+    return HashEmbeddings()
+
+class FakeProcessPool:
+    def __init__(self):
+        self.joined = False
+
+    def close(self):
+        pass
+
+    def join(self):
+        self.joined = True
+
+def test_pipelines_share_one_pool_per_model():
+    first = get_shared_pool("test-pool-model", num_workers=2)
+    assert get_shared_pool("test-pool-model", num_workers=2, batch_size=64) is first
+    assert get_shared_pool("test-other-pool-model", num_workers=2) is not first
+    close_shared_pools()
+
+def test_close_shared_pools_stops_workers():
+    pool = get_shared_pool("test-pool-model", num_workers=2)
+    workers = pool._pool = FakeProcessPool()
+
+    close_shared_pools()
+    assert workers.joined
+    assert pool._pool is None
+    assert embedding_pool._shared_pools == {}
+    assert get_shared_pool("test-pool-model", num_workers=2) is not pool
+    close_shared_pools()
+
+def test_worker_pool_matches_single_process_embeddings(tmp_path):
+    texts = [f"chunk {i}" for i in range(23)] + ["", "naïve café", "中文文本", "emoji 😀 𝔘", "a" * 5000]
+    pool = EmbeddingWorkerPool("hash", num_workers=2, batch_size=3, min_texts=1, embeddings_factory=hash_embeddings)
+    try:
+        vectors = pool.embed_array(texts)
+        # Shards come back out of order and are reassembled by position
+        assert np.array_equal(vectors, np.asarray(HashEmbeddings().embed_documents(texts), dtype=np.float32))
+        assert pool.embed_array([]).shape == (0, 8)
+
+        manager = VectorStoreManager(persist_directory=str(tmp_path / "chroma"), embedding_function=HashEmbeddings(), embedding_pool=pool)
+        manager.initialize_vector_store()
+        chunks = make_chunks("a.txt", 10)
+        assert manager.add_documents(chunks)
+        stored = manager.vector_store._collection.get(include=['embeddings', 'documents'])
+        by_text = dict(zip(stored['documents'], stored['embeddings']))
+        assert np.allclose([by_text[chunk.page_content] for chunk in chunks], HashEmbeddings().embed_documents([chunk.page_content for chunk in chunks]))
+    finally:
+        pool.close()
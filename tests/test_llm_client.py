@@ -0,0 +1,70 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from langchain_core.messages import HumanMessage
+
+from src.llm_client import LLMClient
+
+def invoke_all(client: LLMClient, prompts, concurrency: int):
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(lambda prompt: client.invoke([HumanMessage(content=prompt)]).content, prompts))
+
+def test_throttling_and_server_errors_are_retried(stub_server):
+    server, model = stub_server(rate=20.0, burst=5, error_rate=0.2)
+    client = LLMClient(model, requests_per_second=100.0, burst=20, max_concurrency=8, max_retries=20, backoff_base_seconds=0.05, backoff_max_seconds=0.2, timeout_seconds=30.0)
+    try:
+        answers = invoke_all(client, [f"question {i}" for i in range(40)], concurrency=16)
+    finally:
+        client.close()
+
+    assert answers == [f"answer to: question {i}" for i in range(40)]
+    assert server.counts['throttled'] > 0
+    assert server.counts['errors'] > 0
+    stats = client.get_stats()
+    assert stats['failures'] == 0 and stats['timeouts'] == 0
+    assert stats['retries'] == server.counts['throttled'] + server.counts['errors']
+
+def test_identical_concurrent_prompts_reach_the_server_once(stub_server):
+    server, model = stub_server(latency=0.5)
+    client = LLMClient(model, max_concurrency=8)
+    barrier = threading.Barrier(16)
+
+    def ask(_):
+        barrier.wait()
+        return client.invoke([HumanMessage(content="same question")]).content
+
+    try:
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            answers = list(executor.map(ask, range(16)))
+    finally:
+        client.close()
+
+    assert answers == ["answer to: same question"] * 16
+    assert server.counts['requests'] == 1
+    assert client.get_stats()['coalesced'] == 15
+
+def test_deadline_raises_timeout_error_on_time(stub_server):
+    _, model = stub_server(latency=3.0)
+    client = LLMClient(model, max_retries=4, backoff_base_seconds=0.05, timeout_seconds=30.0)
+    start = time.monotonic()
+    try:
+        with pytest.raises(TimeoutError):
+            client.invoke([HumanMessage(content="slow question")], timeout=0.3)
+    finally:
+        client.close()
+
+    assert time.monotonic() - start < 0.8
+    assert client.get_stats()['timeouts'] == 1
+
+def test_concurrency_never_exceeds_max_concurrency(stub_server):
+    server, model = stub_server(latency=0.05)
+    client = LLMClient(model, requests_per_second=1000.0, burst=1000, max_concurrency=4)
+    try:
+        invoke_all(client, [f"question {i}" for i in range(60)], concurrency=32)
+    finally:
+        client.close()
+
+    assert server.counts['requests'] == 60
+    assert server.peak_in_flight <= 4
+    assert server.peak_in_flight > 1
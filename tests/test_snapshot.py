@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+
+from src.snapshot import SnapshotReplica, export_snapshot
+from src.vector_store import VectorStoreManager
+from tests.test_vector_store import HashEmbeddings, make_chunks
+
+def tagged_chunks(filename: str, count: int, ingested_at: int, tags):
+    chunks = make_chunks(filename, count)
+    for chunk in chunks:
+        chunk.metadata['ingested_at'] = ingested_at
+        for tag in tags:
+            chunk.metadata[f"tag_{tag}"] = True
+    return chunks
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = VectorStoreManager(persist_directory=str(tmp_path / "chroma"), embedding_function=HashEmbeddings())
+    manager.initialize_vector_store()
+    manager.add_documents(tagged_chunks("a.txt", 20, 1000, ["finance"]) + tagged_chunks("b.txt", 20, 2000, ["legal"]) + tagged_chunks("c.txt", 20, 3000, ["finance", "legal"]))
+    return manager
+
+@pytest.fixture
+def replica(manager, tmp_path):
+    path = str(tmp_path / "kb.ragsnap")
+    export_snapshot(manager, path)
+    replica = SnapshotReplica(path, embedding_function=HashEmbeddings())
+    yield replica
+    replica.close()
+
+def ids(results):
+    return [doc.id for doc, _ in results]
+
+def test_replica_matches_chroma_exact_search(manager, replica):
+    for query in ["a.txt chunk 3", "c.txt chunk 11"]:
+        expected = manager.similarity_search_with_score(query, k=5)
+        results = replica.similarity_search_with_score(query, k=5)
+        assert ids(results) == ids(expected)
+        assert np.allclose([score for _, score in results], [score for _, score in expected], atol=1e-4)
+
+def test_metadata_is_stored_as_columns(replica):
+    assert replica.columns['tag_finance']['kind'] == 'bool'
+    assert replica.columns['ingested_at']['kind'] == 'number'
+    assert replica.columns['doc_id']['kind'] == 'string'
+
+@pytest.mark.parametrize("where, filenames", [
+    (VectorStoreManager.build_filter(tags=["finance"]), {"a.txt", "c.txt"}),
+    (VectorStoreManager.build_filter(tags=["legal"], ingested_before=3000), {"b.txt"}),
+    (VectorStoreManager.build_filter(ingested_after=2000), {"b.txt", "c.txt"}),
+    (VectorStoreManager.build_filter(doc_ids=["a.txt", "b.txt"]), {"a.txt", "b.txt"}),
+    ({'$or': [{'doc_id': 'a.txt'}, {'tag_legal': True}]}, {"a.txt", "b.txt", "c.txt"}),
+    ({'doc_id': {'$ne': 'a.txt'}}, {"b.txt", "c.txt"}),
+    ({'doc_id': 'missing.txt'}, set()),
+])
+def test_column_filters_match_chroma(manager, replica, where, filenames):
+    results = replica.similarity_search_with_score("b.txt chunk 5", k=60, filter=where)
+    assert {doc.metadata['filename'] for doc, _ in results} == filenames
+    assert sorted(ids(results)) == sorted(ids(manager.similarity_search_with_score("b.txt chunk 5", k=60, filter=where)))
+
+def test_ivf_index_finds_the_nearest_chunks(manager, tmp_path):
+    path = str(tmp_path / "ivf.ragsnap")
+    assert export_snapshot(manager, path, ivf_lists=4)['ivf_lists'] == 4
+    replica = SnapshotReplica(path, embedding_function=HashEmbeddings(), nprobe=4, exact_search_max_candidates=1)
+    try:
+        assert replica.list_offsets[-1] == 60
+        # Probing every list is exact
+        for query in ["a.txt chunk 3", "c.txt chunk 11"]:
+            assert ids(replica.similarity_search_with_score(query, k=5)) == ids(manager.similarity_search_with_score(query, k=5))
+
+        # A filter with too few matches in the probed lists falls back to scanning all matches
+        replica.nprobe = 1
+        where = VectorStoreManager.build_filter(doc_ids=["b.txt"])
+        results = replica.similarity_search_with_score("a.txt chunk 3", k=10, filter=where)
+        assert len(results) == 10
+        assert all(doc.metadata['filename'] == "b.txt" for doc, _ in results)
+    finally:
+        replica.close()
+
+def test_batched_search_matches_single_searches(replica):
+    queries = ["a.txt chunk 3", "b.txt chunk 7"]
+    embeddings = np.asarray(HashEmbeddings().embed_documents(queries), dtype=np.float32)
+    where = VectorStoreManager.build_filter(tags=["legal"])
+
+    batched = replica.similarity_search_by_vectors_with_score(embeddings, k=3, filter=where)
+    assert [ids(results) for results in batched] == [ids(replica.similarity_search_with_score(query, k=3, filter=where)) for query in queries]
+
+def test_replica_is_read_only(replica):
+    assert replica.add_documents([Document(page_content="new")]) is False
+    assert replica.clear_vector_store() is False
+    assert replica.get_collection_stats()['total_documents'] == 60
+
+def test_replica_pipeline_keeps_answering_when_clear_is_refused(replica, monkeypatch):
+    for module in ("langchain_google_genai", "google.generativeai", "langchain_huggingface"):
+        pytest.importorskip(module)
+    monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+    from src.rag_pipeline import RAGPipeline
+
+    pipeline = RAGPipeline.__new__(RAGPipeline)
+    pipeline.vector_store_manager = replica
+    pipeline.qa_chain = chain = object()
+    assert pipeline.clear_knowledge_base() is False
+    assert pipeline.qa_chain is chain
@@ -0,0 +1,41 @@
+import random
+import pytest
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from src.text_splitter import FastRecursiveTextSplitter
+
+def random_text(seed: int, length: int) -> str:
+    rng = random.Random(seed)
+    alphabet = ["a", "b", "c", " ", " ", "\n", "\n\n", "\n\n\n", "é", "中", "😀", "𝔘"]
+    return "".join(rng.choice(alphabet) for _ in range(length))
+
+TEXTS = [
+    "",
+    "   \n\n  ",
+    "short",
+    "exactly10!",
+    "exactly 10",
+    "eleven char",
+    "The quick brown fox jumps over the lazy dog. " * 5,
+    "para one\n\n\npara two\n\n\n\n\npara three\n\n\n",
+    "line\nline\n\nline\n\n\n\nline " * 6,
+    "abcdefghijklmnopqrstuvwxyz" * 3,
+    "emoji 😀😀😀 and 𝔘𝔫𝔦𝔠𝔬𝔡𝔢 outside the BMP 🎉 " * 4,
+    "中文文本没有空格" * 8,
+    *[random_text(seed, length) for seed, length in enumerate([9, 10, 11, 40, 120, 400])]
+]
+
+@pytest.mark.parametrize("chunk_size, chunk_overlap", [(10, 0), (10, 3), (10, 10), (50, 0), (50, 20), (50, 50)])
+@pytest.mark.parametrize("text", TEXTS)
+def test_chunks_match_the_reference_splitter(text, chunk_size, chunk_overlap):
+    reference = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap, length_function=len)
+    fast = FastRecursiveTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    assert fast.split_text(text) == reference.split_text(text)
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_offsets_point_at_the_chunk_text(text):
+    chunks = FastRecursiveTextSplitter(chunk_size=20, chunk_overlap=5).split_documents([Document(page_content=text, metadata={'source': "t"})])
+    for chunk in chunks:
+        assert text[chunk.metadata['start_index']:chunk.metadata['end_index']] == chunk.page_content
+        assert chunk.metadata['source'] == "t"
@@ -0,0 +1,109 @@
+import hashlib
+from typing import List
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from src.vector_store import VectorStoreManager
+
+class HashEmbeddings(Embeddings):
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        seed = int.from_bytes(hashlib.sha256(text.encode('utf-8')).digest()[:4], 'little')
+        return np.random.default_rng(seed).standard_normal(8).tolist()
+
+def make_chunks(filename: str, count: int) -> List[Document]:
+    return [
+        Document(page_content=f"{filename} chunk {i}", metadata={'doc_id': filename, 'filename': filename, 'chunk_index': i})
+        for i in range(count)
+    ]
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = VectorStoreManager(persist_directory=str(tmp_path / "chroma"), embedding_function=HashEmbeddings())
+    manager.initialize_vector_store()
+    manager.add_documents(make_chunks("a.txt", 20) + make_chunks("b.txt", 20))
+    return manager
+
+def test_batched_search_matches_single_searches(manager):
+    queries = ["a.txt chunk 3", "b.txt chunk 7"]
+    embeddings = np.asarray(HashEmbeddings().embed_documents(queries), dtype=np.float32)
+    where = VectorStoreManager.build_filter(filenames=["b.txt"])
+
+    batched = manager.similarity_search_by_vectors_with_score(embeddings, k=3, filter=where)
+    single = [manager.similarity_search_with_score(query, k=3, filter=where) for query in queries]
+    assert [[doc.id for doc, _ in results] for results in batched] == [[doc.id for doc, _ in results] for results in single]
+    assert all(doc.metadata['filename'] == "b.txt" for results in batched for doc, _ in results)
+
+def test_batched_search_errors_propagate(manager):
+    with pytest.raises(Exception):
+        manager.similarity_search_by_vectors_with_score(np.zeros((2, 3), dtype=np.float32), k=3)
+
+    uninitialized = VectorStoreManager(embedding_function=HashEmbeddings())
+    with pytest.raises(ValueError):
+        uninitialized.similarity_search_by_vectors_with_score(np.zeros((1, 8), dtype=np.float32))
+
+def test_filtered_search_sees_writes_from_other_managers(manager, tmp_path):
+    where = VectorStoreManager.build_filter(filenames=["c.txt"])
+    assert manager.similarity_search("c.txt chunk 1", k=3, filter=where) == []
+
+    other_session = VectorStoreManager(persist_directory=str(tmp_path / "chroma"), embedding_function=HashEmbeddings())
+    other_session.initialize_vector_store()
+    other_session.add_documents(make_chunks("c.txt", 5))
+
+    results = manager.similarity_search("c.txt chunk 1", k=3, filter=where)
+    assert len(results) == 3
+    assert all(doc.metadata['filename'] == "c.txt" for doc in results)
+
+def test_broad_filter_fetches_at_most_threshold_plus_one_id(manager):
+    manager.filter_exact_search_max_candidates = 5
+    assert len(manager._filter_candidates(VectorStoreManager.build_filter(filenames=["a.txt", "b.txt"]))) == 6
+    assert len(manager.similarity_search("a.txt chunk 3", k=4, filter=VectorStoreManager.build_filter(filenames=["a.txt"]))) == 4
+
+def test_collection_metadata_only_sets_configured_params():
+    assert VectorStoreManager.build_collection_metadata({'distance_metric': 'l2', 'm': None, 'ef_construction': None, 'ef_search': None}) == {'hnsw:space': 'l2'}
+    assert VectorStoreManager.build_collection_metadata({'distance_metric': 'cosine', 'm': 32, 'ef_construction': None, 'ef_search': 50}) == {'hnsw:space': 'cosine', 'hnsw:M': 32, 'hnsw:search_ef': 50}
+    with pytest.raises(ValueError):
+        VectorStoreManager.build_collection_metadata({'distance_metric': 'manhattan'})
+
+def test_index_params_round_trip_through_a_collection(tmp_path):
+    params = {'distance_metric': 'cosine', 'm': 32, 'ef_construction': 200, 'ef_search': 50}
+    tuned = VectorStoreManager(persist_directory=str(tmp_path / "tuned"), embedding_function=HashEmbeddings(), index_params=params)
+    tuned.initialize_vector_store()
+    assert VectorStoreManager.read_index_params(tuned.vector_store._collection) == params
+    assert tuned.index_params == params
+
+    # Unset parameters report the values Chroma actually applied
+    default = VectorStoreManager(persist_directory=str(tmp_path / "default"), embedding_function=HashEmbeddings(), index_params={'m': None, 'ef_construction': None, 'ef_search': None})
+    default.initialize_vector_store()
+    hnsw = default.vector_store._collection.configuration_json['hnsw']
+    assert 'hnsw:search_ef' not in (default.vector_store._collection.metadata or {})
+    assert default.index_params == {'distance_metric': 'l2', 'm': hnsw['max_neighbors'], 'ef_construction': hnsw['ef_construction'], 'ef_search': hnsw['ef_search']}
+
+def stored_records(manager):
+    records = manager.vector_store._collection.get(include=['metadatas', 'documents'])
+    return sorted(zip(records['ids'], records['documents'], [sorted(metadata.items()) for metadata in records['metadatas']]))
+
+def test_rebuild_index_keeps_every_record(manager):
+    before = stored_records(manager)
+    assert manager.rebuild_index({'m': 32, 'ef_search': 50})
+
+    assert manager.index_params['m'] == 32 and manager.index_params['ef_search'] == 50
+    assert VectorStoreManager.read_index_params(manager.vector_store._collection) == manager.index_params
+    assert manager.vector_store._collection.count() == 40
+    assert stored_records(manager) == before
+    assert [collection.name for collection in manager.vector_store._client.list_collections()] == [manager.collection_name]
+    assert len(manager.similarity_search("a.txt chunk 3", k=3)) == 3
+
+def test_rebuild_index_applies_configured_params(manager):
+    reopened = VectorStoreManager(persist_directory=manager.persist_directory, embedding_function=HashEmbeddings(), index_params={'ef_search': 60})
+    reopened.initialize_vector_store()
+    # The existing collection keeps its own settings until it is rebuilt
+    assert reopened.index_params['ef_search'] != 60
+
+    assert reopened.rebuild_index()
+    assert reopened.index_params['ef_search'] == 60
+    assert reopened.vector_store._collection.count() == 40